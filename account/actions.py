@@ -1,4 +1,5 @@
 from typing import Literal
+from django.utils import timezone
 from .models import OTPService
 
 
@@ -10,9 +11,11 @@ def save_otp(email:str, otp: str, type: OtpType):
 
 
 def validate_otp(email:str, otp:str, type: OtpType):
-  try:
-    get_otp = OTPService.objects.get(email=email, otp=otp, type=type)
-    get_otp.delete()
-    return True
-  except:
-    return False
\ No newline at end of file
+  # Consuming the OTP is the validation: one DELETE that only matches a live code
+  deleted, _ = OTPService.objects.filter(email=email, otp=otp, type=type, expires_at__gt=timezone.now()).delete()
+  return deleted > 0
+
+
+def delete_otps(email:str, type: OtpType):
+  OTPService.objects.filter(email=email, type=type).delete()
+  return True
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, OTPService, SubscribeInApp, DeleteAccount, PrivacyPolicy, TermsOfUse, SupportMessage, PaystackResponse, UserSubscriptionUsage
+from .models import User, OTPService, SubscribeInApp, DeleteAccount, PrivacyPolicy, TermsOfUse, SupportMessage, PaystackResponse, UserSubscriptionUsage, BulkUserJob, OutboundEmail
 # Register your models here.
 admin.site.register(OTPService)
 admin.site.register(SubscribeInApp)
@@ -9,6 +9,14 @@ admin.site.register(PrivacyPolicy)
 admin.site.register(TermsOfUse)
 admin.site.register(SupportMessage)
 admin.site.register(UserSubscriptionUsage)
+admin.site.register(BulkUserJob)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
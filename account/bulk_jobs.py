@@ -0,0 +1,151 @@
+"""
+Chunked, set-based jobs over the whole user table.
+
+Users are walked in primary key order, CHUNK_SIZE at a time. Each chunk is one transaction
+of bulk statements (an UPDATE per plan, one bulk INSERT of missing UserSubscriptionUsage
+rows) that also advances the BulkUserJob cursor, so a run that dies part way resumes from
+the last committed chunk instead of starting over. Emails for a chunk are queued in the
+same transaction through the email outbox.
+"""
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .emailFunc import send_free_trial_emails
+from .models import BulkUserJob, User, UserSubscriptionUsage, subscription_choices
+from .subscription_utils import allowedUsage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+# A running job that hasn't advanced for this long is considered dead and may be resumed
+STALE_AFTER = timedelta(minutes=15)
+FREE_TRIAL_DAYS = 30
+FREE_TRIAL_PLAN = "basic"
+
+
+def claim_bulk_user_job(job_type):
+    """
+    Resume the unfinished job of this type, or start a new one.
+    Returns None if a live run of the same type is already in progress.
+    """
+    job = BulkUserJob.objects.filter(job_type=job_type).exclude(status="completed").order_by("-started_at").first()
+    if job is None:
+        return BulkUserJob.objects.create(job_type=job_type)
+
+    if job.status == "running" and job.updated_at > timezone.now() - STALE_AFTER:
+        return None
+    # Conditional on the row we just read, so two resumers can't both take it over
+    claimed = BulkUserJob.objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at).update(
+        status="running", error=None, updated_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    logger.info(f"Resuming {job_type} job {job.pk} after user {job.last_user_id or '-'}")
+    return job
+
+
+def iter_user_chunks(queryset, job):
+    """Yield lists of (pk, subscription) after the job's cursor, CHUNK_SIZE at a time."""
+    queryset = queryset.order_by("pk")
+    while True:
+        chunk = list(queryset.filter(pk__gt=job.last_user_id).values_list("pk", "subscription")[:CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+
+
+def set_usage_limits(user_ids, limits):
+    """Set usage of these users to `limits`, creating missing rows. Returns (updated, created)."""
+    updated = UserSubscriptionUsage.objects.filter(user_id__in=user_ids).update(**limits)
+    existing = set(UserSubscriptionUsage.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+    missing = [UserSubscriptionUsage(user_id=user_id, **limits) for user_id in user_ids if user_id not in existing]
+    UserSubscriptionUsage.objects.bulk_create(missing, batch_size=CHUNK_SIZE)
+    return updated, len(missing)
+
+
+def advance(job, last_user_id, processed, updated=0, created=0, emails_queued=0):
+    BulkUserJob.objects.filter(pk=job.pk).update(
+        last_user_id=last_user_id,
+        processed_users=F("processed_users") + processed,
+        updated_usage=F("updated_usage") + updated,
+        created_usage=F("created_usage") + created,
+        emails_queued=F("emails_queued") + emails_queued,
+        updated_at=timezone.now(),
+    )
+    job.last_user_id = last_user_id
+
+
+def finish(job, error=None):
+    BulkUserJob.objects.filter(pk=job.pk).update(
+        status="failed" if error else "completed",
+        error=error,
+        finished_at=None if error else timezone.now(),
+        updated_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    return job
+
+
+def run_bulk_user_job(job_type, queryset, process_chunk):
+    job = claim_bulk_user_job(job_type)
+    if job is None:
+        logger.info(f"{job_type} job already running, not starting another")
+        return None
+
+    BulkUserJob.objects.filter(pk=job.pk).update(
+        total_users=job.processed_users + queryset.filter(pk__gt=job.last_user_id).count()
+    )
+    try:
+        for chunk in iter_user_chunks(queryset, job):
+            process_chunk(job, chunk)
+    except Exception as e:
+        logger.error(f"{job_type} job {job.pk} stopped after user {job.last_user_id or '-'}: {e}")
+        return finish(job, error=str(e))
+
+    job = finish(job)
+    logger.info(
+        f"{job_type} job {job.pk} completed: {job.processed_users} users, "
+        f"{job.updated_usage} usage rows updated, {job.created_usage} created, {job.emails_queued} emails queued"
+    )
+    return job
+
+
+def grant_free_trial_chunk(job, chunk):
+    user_ids = [pk for pk, _ in chunk]
+    with transaction.atomic():
+        User.objects.filter(pk__in=user_ids, subscription="free").update(
+            subscription=FREE_TRIAL_PLAN,
+            free_trail_end_date=timezone.now().date() + timedelta(days=FREE_TRIAL_DAYS),
+        )
+        updated, created = set_usage_limits(user_ids, allowedUsage(FREE_TRIAL_PLAN))
+        emails = list(User.objects.filter(pk__in=user_ids).exclude(email=None).values_list("email", flat=True))
+        queued = send_free_trial_emails(emails)
+        advance(job, user_ids[-1], len(user_ids), updated, created, queued)
+
+
+def run_free_trial_grant():
+    """Move every free user to the trial plan with its usage limits and email them."""
+    return run_bulk_user_job("free_trial", User.objects.filter(subscription="free"), grant_free_trial_chunk)
+
+
+def reset_usage_chunk(job, chunk):
+    by_plan = {}
+    for pk, plan in chunk:
+        by_plan.setdefault(plan, []).append(pk)
+
+    updated = created = 0
+    with transaction.atomic():
+        for plan, user_ids in by_plan.items():
+            plan_updated, plan_created = set_usage_limits(user_ids, allowedUsage(plan))
+            updated += plan_updated
+            created += plan_created
+        advance(job, chunk[-1][0], len(chunk), updated, created)
+
+
+def run_usage_reset():
+    """Reset every user's usage to the limits of their plan."""
+    plans = [plan for plan, _ in subscription_choices]
+    return run_bulk_user_job("usage_reset", User.objects.filter(subscription__in=plans), reset_usage_chunk)
@@ -1,6 +1,5 @@
 from django.template.loader import render_to_string
-from django.core.mail import EmailMessage
-from django.conf import settings
+from .outbox import enqueue_bulk_email, enqueue_email
 import random
 
 def get_random_thank_you_message():
@@ -44,14 +43,8 @@ def send_verification_email(_email, otp):
         'end_msg': end_msg
     })
 
-    email = EmailMessage(
-        subject,
-        html_message,
-        settings.EMAIL_HOST_USER,
-        [_email]
-    )
-    email.content_subtype = 'html'  # Set the email content type to HTML
-    email.send()
+    # Delivered by the outbox worker, see account/outbox.py
+    enqueue_email(subject, html_message, _email, is_html=True)
     return True
 
 
@@ -69,14 +62,8 @@ def send_welcome_email(_email, first_name, language):
         'thank_you_msg': get_random_thank_you_message(language),
     })
 
-    email = EmailMessage(
-        subject,
-        html_message,
-        settings.EMAIL_HOST_USER,
-        [_email]
-    )
-    email.content_subtype = 'html'  # Set the email content type to HTML
-    email.send()
+    # Delivered by the outbox worker, see account/outbox.py
+    enqueue_email(subject, html_message, _email, is_html=True)
     return True
 
 
@@ -89,12 +76,15 @@ def send_free_trial_email(_email):
     
     html_message = render_to_string(freeTrailTemplate)
 
-    email = EmailMessage(
-        subject,
-        html_message,
-        settings.EMAIL_HOST_USER,
-        [_email]
-    )
-    email.content_subtype = 'html'  # Set the email content type to HTML
-    email.send()
+    # Delivered by the outbox worker, see account/outbox.py
+    enqueue_email(subject, html_message, _email, is_html=True)
     return True
+
+
+def send_bulk_html_email(subject, html_message, recipients):
+    """Queue the same rendered HTML email to many recipients, one message each. Returns the number queued."""
+    return enqueue_bulk_email(subject, html_message, recipients, is_html=True)
+
+
+def send_free_trial_emails(emails):
+    return send_bulk_html_email('Congratulations - 30 Days free trial', render_to_string("freeTrailTemplate.html"), emails)
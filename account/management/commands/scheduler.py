@@ -7,10 +7,15 @@ from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from django.core.management.base import BaseCommand
 from django_apscheduler.jobstores import DjangoJobStore
-from django_apscheduler.models import DjangoJobExecution
+from django_apscheduler.models import DjangoJob, DjangoJobExecution
 from django_apscheduler import util
 from apscheduler.triggers.interval import IntervalTrigger
 from account.tasks import clear_otps, test_scheduler_job
+from books.get_top_50_books import refresh_top_50_snapshot
+from books.chat_ai.prompt_cache import evict_chat_prompt_caches
+from account.outbox import drain_outbox, prune_outbox
+from notifications.dispatch import dispatch_due_notifications
+from books.task_queue import prune_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +40,48 @@ def delete_old_job_executions(max_age=604_800):
     logger.info(f"✓ Deleted job executions older than {max_age} seconds")
 
 
+@util.close_old_connections
+def clear_expired_otps():
+    """Delete OTPs past their expires_at."""
+    clear_otps()
+
+
+@util.close_old_connections
+def drain_email_outbox():
+    """Deliver queued emails, polling for new ones for most of the minute until the next run."""
+    drain_outbox(run_for=55)
+
+
+@util.close_old_connections
+def prune_email_outbox():
+    """Delete delivered outbox emails older than a week."""
+    prune_outbox()
+
+
+@util.close_old_connections
+def dispatch_note_notifications():
+    """Push every note reminder whose next_fire_at has passed."""
+    dispatch_due_notifications()
+
+
+@util.close_old_connections
+def prune_background_tasks():
+    """Fail tasks orphaned on their last attempt and delete old succeeded ones."""
+    prune_tasks()
+
+
+@util.close_old_connections
+def refresh_top_books_snapshot():
+    """Rebuild the stored top 50 books list so the /top_50/ endpoint never calls Google Books."""
+    refresh_top_50_snapshot()
+
+
+@util.close_old_connections
+def evict_chat_prompt_cache():
+    """Delete Gemini chat prompt caches of old prompt versions and the least recently used past the cap."""
+    evict_chat_prompt_caches()
+
+
 class Command(BaseCommand):
     help = "Runs APScheduler."
 
@@ -46,15 +93,75 @@ class Command(BaseCommand):
         logger.info("APScheduler is starting...")
         logger.info("=" * 50)
 
-        # DAILY OTP CLEANUP JOB
+        # EXPIRED OTP CLEANUP JOB - replaces the old daily sweep, drop it from the job store
+        DjangoJob.objects.filter(id="daily_otp_cleanup").delete()
+        scheduler.add_job(
+            clear_expired_otps,
+            trigger=IntervalTrigger(minutes=5),
+            id="otp_cleanup",  # The `id` assigned to each job MUST be unique
+            max_instances=1,
+            replace_existing=True,
+        )
+        logger.info("✓ Added job: 'otp_cleanup' - Runs every 5 minutes")
+
+        # EMAIL OUTBOX - requests queue emails, this job delivers them
+        scheduler.add_job(
+            drain_email_outbox,
+            trigger=IntervalTrigger(minutes=1),
+            id="drain_email_outbox",
+            max_instances=1,
+            replace_existing=True,
+        )
+        logger.info("✓ Added job: 'drain_email_outbox' - Runs every minute")
+
+        scheduler.add_job(
+            prune_email_outbox,
+            trigger=CronTrigger(hour="03", minute="00"),
+            id="prune_email_outbox",
+            max_instances=1,
+            replace_existing=True,
+        )
+        logger.info("✓ Added job: 'prune_email_outbox' - Runs daily at 3:00 AM UTC")
+
+        # NOTE REMINDER PUSH NOTIFICATIONS
+        scheduler.add_job(
+            dispatch_note_notifications,
+            trigger=IntervalTrigger(minutes=1),
+            id="dispatch_note_notifications",
+            max_instances=1,
+            replace_existing=True,
+        )
+        logger.info("✓ Added job: 'dispatch_note_notifications' - Runs every minute")
+
+        # BACKGROUND TASK QUEUE HOUSEKEEPING - the tasks themselves run in the task_worker service
+        scheduler.add_job(
+            prune_background_tasks,
+            trigger=IntervalTrigger(minutes=15),
+            id="prune_background_tasks",
+            max_instances=1,
+            replace_existing=True,
+        )
+        logger.info("✓ Added job: 'prune_background_tasks' - Runs every 15 minutes")
+
+        # TOP 50 BOOKS SNAPSHOT - served by /books/top_50/ without upstream calls
+        scheduler.add_job(
+            refresh_top_books_snapshot,
+            trigger=IntervalTrigger(hours=6),
+            id="refresh_top_50_snapshot",
+            max_instances=1,
+            replace_existing=True,
+        )
+        logger.info("✓ Added job: 'refresh_top_50_snapshot' - Runs every 6 hours")
+
+        # GEMINI CHAT PROMPT CACHE EVICTION
         scheduler.add_job(
-            clear_otps,
-            trigger=CronTrigger(hour="02", minute="00"),  # 2:00AM EVERYDAY
-            id="daily_otp_cleanup",  # The `id` assigned to each job MUST be unique
+            evict_chat_prompt_cache,
+            trigger=IntervalTrigger(minutes=30),
+            id="evict_chat_prompt_cache",
             max_instances=1,
             replace_existing=True,
         )
-        logger.info("✓ Added job: 'daily_otp_cleanup' - Runs daily at 2:00 AM UTC")
+        logger.info("✓ Added job: 'evict_chat_prompt_cache' - Runs every 30 minutes")
 
         scheduler.add_job(
             delete_old_job_executions,
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_alter_supportmessage_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkUserJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('free_trial', 'free_trial'), ('usage_reset', 'usage_reset')], max_length=50)),
+                ('status', models.CharField(choices=[('running', 'running'), ('completed', 'completed'), ('failed', 'failed')], default='running', max_length=20)),
+                ('last_user_id', models.CharField(blank=True, default='', max_length=100)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('processed_users', models.PositiveIntegerField(default=0)),
+                ('updated_usage', models.PositiveIntegerField(default=0)),
+                ('created_usage', models.PositiveIntegerField(default=0)),
+                ('emails_sent', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:38
+
+import account.models
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_bulk_user_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='otpservice',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='otpservice',
+            name='expires_at',
+            field=models.DateTimeField(default=account.models.otp_expiry),
+        ),
+        migrations.AddIndex(
+            model_name='otpservice',
+            index=models.Index(fields=['email', 'type', 'expires_at'], name='otp_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpservice',
+            index=models.Index(fields=['expires_at'], name='otp_expiry_idx'),
+        ),
+    ]
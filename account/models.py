@@ -1,4 +1,6 @@
+from datetime import timedelta
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import  AbstractUser, PermissionsMixin
 from .utils import generate_id
 from .managers import UserManager
@@ -71,10 +73,87 @@ class UserSubscriptionUsage(models.Model):
     def __str__(self):
         return self.user.email
 
+bulk_user_job_types = (
+    ("free_trial", "free_trial"),
+    ("usage_reset", "usage_reset"),
+)
+
+bulk_user_job_status = (
+    ("running", "running"),
+    ("completed", "completed"),
+    ("failed", "failed"),
+)
+
+
+class BulkUserJob(models.Model):
+    """Progress of a chunked job over all users. last_user_id is where an interrupted run resumes."""
+    job_type = models.CharField(max_length=50, choices=bulk_user_job_types)
+    status = models.CharField(max_length=20, choices=bulk_user_job_status, default="running")
+    last_user_id = models.CharField(max_length=100, blank=True, default="")
+    total_users = models.PositiveIntegerField(default=0)
+    processed_users = models.PositiveIntegerField(default=0)
+    updated_usage = models.PositiveIntegerField(default=0)
+    created_usage = models.PositiveIntegerField(default=0)
+    emails_queued = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.job_type} ({self.status})"
+
+
+outbound_email_status = (
+    ("pending", "pending"),
+    ("sending", "sending"),
+    ("sent", "sent"),
+    ("dead", "dead"),
+)
+
+
+class OutboundEmail(models.Model):
+    """Email written by a request (inside its transaction) and delivered later by the outbox worker."""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    is_html = models.BooleanField(default=False)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=outbound_email_status, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+OTP_TTL = timedelta(minutes=30)
+
+
+def otp_expiry():
+    return timezone.now() + OTP_TTL
+
+
 class OTPService(models.Model):
     type =  models.CharField(max_length=100, choices=otp_service_type)
     email = models.CharField(max_length=255)
     otp = models.CharField(max_length=4)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(default=otp_expiry)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["email", "type", "expires_at"], name="otp_lookup_idx"),
+            models.Index(fields=["expires_at"], name="otp_expiry_idx"),
+        ]
 
     def __str__(self):
         return self.email
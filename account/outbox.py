@@ -0,0 +1,190 @@
+"""
+Transactional email outbox.
+
+Requests don't talk to SMTP. They write OutboundEmail rows, inside their own transaction
+when they have one, so an email exists exactly when the change that triggered it commits.
+drain_outbox(), run by the scheduler, claims due rows with SELECT ... FOR UPDATE SKIP LOCKED
+(concurrent drainers never pick the same email) and delivers them over one reused SMTP
+connection. Failures are retried with exponential backoff; after MAX_ATTEMPTS the email is
+marked dead and left for inspection in the admin. If the server drops the connection, the
+rest of the batch goes back to the queue without losing an attempt and the next batch
+reconnects.
+"""
+import logging
+import smtplib
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+# Retry n waits RETRY_BASE * 2 ** (n - 1): 1, 2, 4, 8 minutes
+RETRY_BASE = timedelta(minutes=1)
+# A claimed email whose drainer died becomes due again after this long
+CLAIM_TIMEOUT = timedelta(minutes=10)
+POLL_INTERVAL = 2
+KEEP_SENT_FOR = timedelta(days=7)
+# Errors that mean the connection itself is gone, not that one message was refused
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def enqueue_email(subject, body, to, is_html=False, from_email=None):
+    """Queue one email (to: address or list of addresses) for the outbox worker."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        is_html=is_html,
+        from_email=from_email or settings.EMAIL_HOST_USER,
+        to=[to] if isinstance(to, str) else list(to),
+    )
+
+
+def enqueue_bulk_email(subject, body, recipients, is_html=False, from_email=None):
+    """Queue the same email to each recipient separately, in one INSERT per batch. Returns how many were queued."""
+    from_email = from_email or settings.EMAIL_HOST_USER
+    emails = OutboundEmail.objects.bulk_create(
+        [
+            OutboundEmail(subject=subject, body=body, is_html=is_html, from_email=from_email, to=[recipient])
+            for recipient in recipients
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return len(emails)
+
+
+def claim_batch(limit=BATCH_SIZE):
+    """Take up to `limit` due emails for this drainer. Rows locked by another drainer are skipped."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=["pending", "sending"], next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        OutboundEmail.objects.filter(id__in=ids).update(
+            status="sending", attempts=F("attempts") + 1, next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by("next_attempt_at", "id"))
+
+
+def build_message(outbound, connection):
+    message = EmailMessage(outbound.subject, outbound.body, outbound.from_email, outbound.to, connection=connection)
+    if outbound.is_html:
+        message.content_subtype = "html"
+    return message
+
+
+def record_failure(outbound, error):
+    if outbound.attempts >= MAX_ATTEMPTS:
+        OutboundEmail.objects.filter(pk=outbound.pk).update(status="dead", last_error=error)
+        logger.error(f"Email {outbound.pk} '{outbound.subject}' dead after {outbound.attempts} attempts: {error}")
+        return
+    OutboundEmail.objects.filter(pk=outbound.pk).update(
+        status="pending",
+        last_error=error,
+        next_attempt_at=timezone.now() + RETRY_BASE * 2 ** (outbound.attempts - 1),
+    )
+
+
+def record_sent(outbound):
+    OutboundEmail.objects.filter(pk=outbound.pk).update(status="sent", sent_at=timezone.now(), last_error=None)
+
+
+def release(batch):
+    """Put claimed emails that were never tried back in the queue, giving back their attempt."""
+    OutboundEmail.objects.filter(pk__in=[outbound.pk for outbound in batch], status="sending").update(
+        status="pending", attempts=F("attempts") - 1, next_attempt_at=timezone.now()
+    )
+
+
+def deliver_batch(batch, connection):
+    """
+    Send a claimed batch over an open connection. Each message is handed to send_messages()
+    on its own so one rejected recipient only retries that email, and is marked sent as soon
+    as it is accepted, so a crash mid-batch can't send it again after the claim expires.
+    Returns (number sent, whether the connection was lost part way).
+    """
+    sent = 0
+    connection_lost = False
+    for position, outbound in enumerate(batch):
+        try:
+            if connection.send_messages([build_message(outbound, connection)]):
+                record_sent(outbound)
+                sent += 1
+            else:
+                record_failure(outbound, "Not accepted by the mail backend")
+        except CONNECTION_ERRORS as e:
+            # Every later message would fail the same way on this connection
+            logger.warning(f"Outbox lost the SMTP connection: {e}")
+            record_failure(outbound, str(e))
+            release(batch[position + 1:])
+            connection_lost = True
+            break
+        except Exception as e:
+            record_failure(outbound, str(e))
+    return sent, connection_lost
+
+
+def close_connection(connection):
+    try:
+        connection.close()
+    except Exception as e:
+        # A dropped connection can fail to QUIT; the socket is closed either way
+        logger.warning(f"Outbox failed to close the SMTP connection: {e}")
+
+
+def drain_outbox(run_for=0):
+    """
+    Deliver due emails until the outbox is empty. With run_for (seconds) keep polling for new
+    emails until that much time has passed, so a job started every minute gives seconds of latency.
+    The SMTP connection is opened when there is work and reused until the outbox runs dry.
+    """
+    deadline = time.monotonic() + run_for
+    sent = 0
+    connection = None
+    try:
+        while True:
+            batch = claim_batch()
+            if batch:
+                try:
+                    if connection is None:
+                        connection = get_connection()
+                        connection.open()
+                except Exception as e:
+                    connection = None
+                    for outbound in batch:
+                        record_failure(outbound, f"Could not connect: {e}")
+                else:
+                    batch_sent, connection_lost = deliver_batch(batch, connection)
+                    sent += batch_sent
+                    if connection_lost:
+                        close_connection(connection)
+                        connection = None
+                    continue
+
+            if connection is not None:
+                close_connection(connection)
+                connection = None
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+    finally:
+        if connection is not None:
+            close_connection(connection)
+    if sent:
+        logger.info(f"Outbox delivered {sent} emails")
+    return sent
+
+
+def prune_outbox():
+    """Delete delivered emails older than KEEP_SENT_FOR. Dead emails are kept."""
+    deleted, _ = OutboundEmail.objects.filter(status="sent", sent_at__lt=timezone.now() - KEEP_SENT_FOR).delete()
+    return deleted
@@ -1,5 +1,6 @@
 from .models import UserSubscriptionUsage
 from functools import wraps
+from django.db.models import F
 from rest_framework.response import Response
 from rest_framework import status
 
@@ -50,28 +51,36 @@ def create_subscription(user):
 
 
 
-def update_subscription_usage(user, usage):
-    get_user_subscription = UserSubscriptionUsage.objects.get(user=user)
-    if usage == "summaries":
-        get_user_subscription.summaries -= 1
-    elif usage == "notes":
-        get_user_subscription.notes -= 1
-    elif usage == "reminders":
-        get_user_subscription.reminders -= 1
-    elif usage == "smart_search":
-        get_user_subscription.smart_search -= 1
-    else:
+USAGE_TYPES = ("summaries", "notes", "reminders", "smart_search")
+
+
+def consume_subscription_usage(user, usage):
+    """
+    Take one unit of `usage` from the user's remaining quota with a single conditional UPDATE
+    (usage = usage - 1 WHERE usage > 0). Returns whether quota was granted; concurrent
+    requests can't overdraw it.
+    """
+    if usage not in USAGE_TYPES:
         return False
-    get_user_subscription.save()
-    return True
+    return UserSubscriptionUsage.objects.filter(user=user, **{f"{usage}__gt": 0}).update(
+        **{usage: F(usage) - 1}
+    ) > 0
 
 
+def refund_subscription_usage(user, usage):
+    """Give back a unit taken by consume_subscription_usage when the metered work failed."""
+    if usage not in USAGE_TYPES:
+        return False
+    return UserSubscriptionUsage.objects.filter(user=user).update(**{usage: F(usage) + 1}) > 0
 
 
 def subscription_limit_required(usage_type: str):
     """
-    Decorator to restrict access based on user's subscription usage.
+    Decorator that meters a view against the user's subscription usage.
     usage_type: 'summaries', 'notes', 'reminders', 'smart_search'
+
+    One unit is consumed atomically before the view runs and refunded if the view
+    raises or answers with an error status, so views don't update usage themselves.
     """
     def decorator(view_func):
         @wraps(view_func)
@@ -84,36 +93,26 @@ def subscription_limit_required(usage_type: str):
                     "status": "error",
                 }, status=status.HTTP_401_UNAUTHORIZED)
 
-            try:
-                subscription = UserSubscriptionUsage.objects.get(user=user)
-            except UserSubscriptionUsage.DoesNotExist:
-                # print("USER CANT USE THIS CUS OF SUB")
-                return Response({
-                    "errors": "NoSubscription",
-                    "message": "No active subscription found.",
-                    "status": "error",
-                }, status=status.HTTP_403_FORBIDDEN)
-
-            # Check available quota
-            allowed = False
-            if usage_type == "summaries" and subscription.summaries > 0:
-                allowed = True
-            elif usage_type == "notes" and subscription.notes > 0:
-                allowed = True
-            elif usage_type == "reminders" and subscription.reminders > 0:
-                allowed = True
-            elif usage_type == "smart_search" and subscription.smart_search > 0:
-                allowed = True
-
-            if not allowed:
+            if not consume_subscription_usage(user, usage_type):
+                if not UserSubscriptionUsage.objects.filter(user=user).exists():
+                    return Response({
+                        "errors": "NoSubscription",
+                        "message": "No active subscription found.",
+                        "status": "error",
+                    }, status=status.HTTP_403_FORBIDDEN)
                 return Response({
                     "errors": "UsageLimitReached",
                     "message": f"You've reached your {usage_type} usage limit. Upgrade your plan to continue.",
                     "status": "error",
                 }, status=status.HTTP_403_FORBIDDEN)
 
-            # Continue with original view
-            return view_func(request, *args, **kwargs)
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                refund_subscription_usage(user, usage_type)
+                raise
+            if response.status_code >= 400:
+                refund_subscription_usage(user, usage_type)
+            return response
         return _wrapped_view
     return decorator
-
@@ -1,4 +1,5 @@
-from .models import OTPService, User, UserSubscriptionUsage
+from .models import OTPService
+from .bulk_jobs import run_usage_reset
 import logging
 from django.core.mail import send_mail
 from django.conf import settings
@@ -8,10 +9,9 @@ logger = logging.getLogger(__name__)
 
 
 def clear_otps():
-    get_all_otps = OTPService.objects.all()
-    for otp in get_all_otps:
-        otp.delete()
-
+    """Delete expired OTPs in one statement (indexed on expires_at), cheap enough to run every few minutes."""
+    deleted, _ = OTPService.objects.filter(expires_at__lte=timezone.now()).delete()
+    logger.info(f"Deleted {deleted} expired OTPs")
     return "OKAY"
 
 
@@ -76,90 +76,31 @@ BookFlow API - Automated Scheduler
 
 def update_all_user_subscription_usage():
     """
-    Updates all users' subscription usage values to new limits:
-    - summaries: 10
-    - notes: 25
-    - reminders: 10
-    - smart_search: 10
-
-    This function will:
-    1. Loop through all User objects
-    2. Get or create UserSubscriptionUsage for each user
-    3. Update the usage values
+    Resets every user's subscription usage to the limits of their plan (see allowedUsage),
+    creating missing UserSubscriptionUsage rows. Runs as a chunked, resumable BulkUserJob.
 
     Returns:
         dict: Summary of the operation (total users, updated count, created count, errors)
     """
-    logger.info("=" * 60)
     logger.info("Starting update_all_user_subscription_usage task")
-    logger.info("=" * 60)
-
-    total_users = 0
-    updated_count = 0
-    created_count = 0
-    errors = []
-
-    try:
-        all_users = User.objects.all()
-        total_users = all_users.count()
-
-        logger.info(f"Found {total_users} users to process")
-
-        for user in all_users:
-            try:
-                # Get or create UserSubscriptionUsage for this user
-                usage, created = UserSubscriptionUsage.objects.get_or_create(
-                    user=user,
-                    defaults={
-                        'summaries': 10,
-                        'notes': 25,
-                        'reminders': 10,
-                        'smart_search': 10,
-                    }
-                )
-
-                if created:
-                    created_count += 1
-                    logger.info(f"✓ Created new subscription usage for {user.email}")
-                else:
-                    # Update existing record
-                    usage.summaries = 10
-                    usage.notes = 25
-                    usage.reminders = 10
-                    usage.smart_search = 10
-                    usage.save()
-                    updated_count += 1
-                    logger.info(f"✓ Updated subscription usage for {user.email}")
-
-            except Exception as e:
-                error_msg = f"Error processing user {user.email}: {str(e)}"
-                logger.error(f"✗ {error_msg}")
-                errors.append(error_msg)
-
-        # Summary
-        logger.info("=" * 60)
-        logger.info("Update completed!")
-        logger.info(f"Total users: {total_users}")
-        logger.info(f"Created: {created_count}")
-        logger.info(f"Updated: {updated_count}")
-        logger.info(f"Errors: {len(errors)}")
-        logger.info("=" * 60)
-
-        result = {
-            'status': 'SUCCESS',
-            'total_users': total_users,
-            'created_count': created_count,
-            'updated_count': updated_count,
-            'errors_count': len(errors),
-            'errors': errors
+    job = run_usage_reset()
+    if job is None:
+        return {
+            'status': 'FAILED',
+            'error': 'A usage reset is already running'
         }
-
-        return result
-
-    except Exception as e:
-        error_msg = f"Fatal error in update_all_user_subscription_usage: {str(e)}"
-        logger.error(error_msg)
+    if job.status != "completed":
         return {
             'status': 'FAILED',
-            'error': error_msg
-        }
\ No newline at end of file
+            'error': f"Stopped after user {job.last_user_id or '-'}, run again to resume: {job.error}",
+            'job_id': job.pk,
+        }
+    return {
+        'status': 'SUCCESS',
+        'job_id': job.pk,
+        'total_users': job.total_users,
+        'created_count': job.created_usage,
+        'updated_count': job.updated_usage,
+        'errors_count': 0,
+        'errors': []
+    }
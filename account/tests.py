@@ -1,3 +1,105 @@
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .outbox import CLAIM_TIMEOUT, MAX_ATTEMPTS, RETRY_BASE, claim_batch, drain_outbox, enqueue_bulk_email
+
+
+class FlakyConnection:
+    """Mail connection that drops after `drop_after` messages, like a server closing the session."""
+
+    opened = 0
+
+    def __init__(self, drop_after=None, sent=None):
+        self.drop_after = drop_after
+        self.sent = sent if sent is not None else []
+        self.count = 0
+
+    def open(self):
+        FlakyConnection.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        if self.drop_after is not None and self.count >= self.drop_after:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.count += 1
+        self.sent.extend(message.to[0] for message in messages)
+        return len(messages)
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        FlakyConnection.opened = 0
+        enqueue_bulk_email("Hello", "Body", [f"reader{i}@bookflow.test" for i in range(5)])
+
+    def test_claimed_emails_are_leased_to_one_drainer(self):
+        batch = claim_batch(limit=3)
+
+        self.assertEqual(len(batch), 3)
+        self.assertTrue(all(email.status == "sending" and email.attempts == 1 for email in batch))
+        self.assertEqual(len(claim_batch()), 2)
+        self.assertEqual(claim_batch(), [])
+
+    def test_expired_lease_makes_the_email_due_again(self):
+        batch = claim_batch()
+        OutboundEmail.objects.filter(pk=batch[0].pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+        reclaimed = claim_batch()
+
+        self.assertEqual([email.pk for email in reclaimed], [batch[0].pk])
+        self.assertEqual(reclaimed[0].attempts, 2)
+        self.assertGreater(reclaimed[0].next_attempt_at, timezone.now() + CLAIM_TIMEOUT - timedelta(seconds=5))
+
+    def test_failures_back_off_then_go_dead(self):
+        OutboundEmail.objects.exclude(pk=OutboundEmail.objects.order_by("id").first().pk).delete()
+        connection = FlakyConnection()
+        connection.send_messages = mock.Mock(side_effect=smtplib.SMTPRecipientsRefused({}))
+
+        with mock.patch("account.outbox.get_connection", return_value=connection):
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                before = timezone.now()
+                drain_outbox()
+                email = OutboundEmail.objects.get()
+                self.assertEqual(email.attempts, attempt)
+                if attempt < MAX_ATTEMPTS:
+                    self.assertEqual(email.status, "pending")
+                    self.assertGreaterEqual(email.next_attempt_at, before + RETRY_BASE * 2 ** (attempt - 1))
+                    OutboundEmail.objects.update(next_attempt_at=timezone.now())
+
+        self.assertEqual(email.status, "dead")
+        self.assertIsNotNone(email.last_error)
+
+    def test_dropped_connection_reconnects_without_burning_the_batch(self):
+        sent = []
+        connections = iter([FlakyConnection(drop_after=2, sent=sent), FlakyConnection(sent=sent)])
+
+        with mock.patch("account.outbox.get_connection", side_effect=lambda: next(connections)):
+            self.assertEqual(drain_outbox(), 4)
+
+        self.assertEqual(FlakyConnection.opened, 2)
+        self.assertEqual(len(sent), 4)
+        # Only the message in flight when the server hung up used an attempt and waits to retry
+        failed = OutboundEmail.objects.exclude(status="sent")
+        self.assertEqual([(email.status, email.attempts) for email in failed], [("pending", 1)])
+        self.assertEqual(set(OutboundEmail.objects.filter(status="sent").values_list("attempts", flat=True)), {1})
+
+    def test_each_email_is_marked_sent_once_accepted(self):
+        connection = FlakyConnection()
+        send_messages = connection.send_messages
+        sent_before_each = []
+
+        def send_and_record(messages):
+            sent_before_each.append(OutboundEmail.objects.filter(status="sent").count())
+            return send_messages(messages)
+
+        connection.send_messages = send_and_record
+        with mock.patch("account.outbox.get_connection", return_value=connection):
+            self.assertEqual(drain_outbox(), 5)
 
-# Create your tests here.
+        self.assertEqual(sent_before_each, [0, 1, 2, 3, 4])
@@ -15,8 +15,9 @@ from .models import OTPService, DeleteAccount, PrivacyPolicy, TermsOfUse, UserSu
 from .emailFunc import send_verification_email, send_free_trial_email
 from .utils import generate_otp
 from books.tasks import single_free_trial
-from .actions import save_otp, validate_otp
-from django.core.mail import send_mail
+from .actions import save_otp, validate_otp, delete_otps
+from django.db import transaction
+from .outbox import enqueue_email
 from django.conf import settings
 from .subscription_utils import getSubcriptionUsage, create_subscription, allowedUsage
 # from notification.models import UserNotification
@@ -27,9 +28,11 @@ import time
 # from .helpers import send_notiifcation
 from django.views.decorators.cache import cache_page
 from django_ratelimit.decorators import ratelimit
+from books.static_catalogs import StaticCatalog
 # from .scheduler import scheduler
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+PRICING = StaticCatalog("pricing.json")
 # Create your views here.
 
 
@@ -57,13 +60,15 @@ def register(request):
         data['username'] = data['email']
         serializer = SignUpSerializer(data=data)
         if serializer.is_valid(raise_exception=True):
-            user = serializer.save()
+            # The verification email is queued in the same transaction as the account
+            with transaction.atomic():
+                user = serializer.save()
+                create_subscription(user)
+                OTP = generate_otp()
+                save_otp(data["email"], str(OTP), "email_verification")
+                send_verification_email(data["email"], str(OTP))
             refresh = RefreshToken.for_user(user)
             access_token = str(refresh.access_token)
-            create_subscription(user)
-            OTP = generate_otp()
-            save_otp(data["email"], str(OTP), "email_verification")
-            send_verification_email(data["email"], str(OTP))
             
             # # TRY STORYING USER PUSH NOTIFICATION
             # try:
@@ -189,9 +194,7 @@ class MyTokenObtainPairView(TokenObtainPairView):
 def resend_OTP(request):
     email = request.data['email']
     
-    get_previous = OTPService.objects.filter(email=email).last()
-    if get_previous:
-        get_previous.delete()
+    delete_otps(email, "email_verification")
         
     OTP = generate_otp()
     save_otp(email, str(OTP), "email_verification")
@@ -215,20 +218,13 @@ def forgot_password(request):
         if(get_user.status == "suspended"):
             return Response("error", status.HTTP_400_BAD_REQUEST)
         
-        try:
-            # DELETE ANYONE THAT ALREADY EXISTS
-            reset_password = OTPService.objects.filter(email=email.lower(), type="password_reset").first()
-            reset_password.delete()
-        except:
-            pass
-        
-        print("email: ", email)
-        save_otp(email, otp, "password_reset")
-
         email_message = f"Reset your password \nHere is your One Time Password (OTP): {otp} \n\nIF YOU DIDN'T REQUEST TO CHANGE YOUR PASSWORD, PLEASE IGNORE THIS MESSAGE AND DO NOT SHARE THIS CODE WITH ANYONE, INCLUDING US. \n\nSincerely, \BookFlow Team"
 
-        send_mail("Change Password", email_message, settings.EMAIL_HOST_USER, [
-            email], fail_silently=False)
+        with transaction.atomic():
+            # DELETE ANYONE THAT ALREADY EXISTS
+            delete_otps(email.lower(), "password_reset")
+            save_otp(email, otp, "password_reset")
+            enqueue_email("Change Password", email_message, email)
         return Response({
                 "data": None,
                 "errors": None,
@@ -369,14 +365,7 @@ def biometric_login(request):
 # @cache_page(60 * 60)
 @api_view(["GET"])
 def load_pricing(request):
-    pricing_path = os.path.join(BASE_DIR, 'static', "pricing.json")
-    load_pricing = open(pricing_path, 'r')
-    pricing = json.load(load_pricing)
-    return Response({   
-        "data": pricing, 
-        "message":"success",
-        "status": status.HTTP_200_OK,
-        }, status=status.HTTP_200_OK)
+    return PRICING.response(request)
     
     
 
@@ -483,13 +472,12 @@ def contact_support(request):
     try:
         serializer = SupportSerializer(data=data)
         if serializer.is_valid(raise_exception=True):
-            serializer.save()
-            
-            send_mail("BookFlow Support", f"From: {data['email']} \nMessage: {data['message']}", settings.EMAIL_HOST_USER, [
-            "kolosafo@gmail.com"], fail_silently=False)
-            
-            send_mail("BookFlow Support", f"Thanks for contacting support, your message has been recieved! \nOne of our support members will get back to you shortly. \nRegards, \BookFlow team", settings.EMAIL_HOST_USER, [
-                data['email']], fail_silently=False)
+            with transaction.atomic():
+                serializer.save()
+                
+                enqueue_email("BookFlow Support", f"From: {data['email']} \nMessage: {data['message']}", "kolosafo@gmail.com")
+                
+                enqueue_email("BookFlow Support", f"Thanks for contacting support, your message has been recieved! \nOne of our support members will get back to you shortly. \nRegards, \BookFlow team", data['email'])
 
             return Response({
                     "data": None,
@@ -531,12 +519,8 @@ def give_free_trial(request):
 # @permission_classes([IsAuthenticated])
 def update_subscription_usage(request):
     """
-    Endpoint to update all users' subscription usage values.
-    Updates all UserSubscriptionUsage records to:
-    - summaries: 10
-    - notes: 25
-    - reminders: 10
-    - smart_search: 10
+    Endpoint to reset all users' subscription usage values to the limits
+    of their plan (see allowedUsage). An interrupted run resumes where it stopped.
 
     Requires authentication (staff/admin users only recommended).
     """
@@ -0,0 +1,86 @@
+import os
+import time
+import django
+
+# Setup Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bookflow_api.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from books.models import MainArgument, Framework, FrameworkComponent, KeyInsight, ImplementationGuide, ImplementationStep, ImplementationMeta, OnePageSummary, BookAnalysisResponse
+from books.save_summary import save_book_analysis
+from books.summary_response_example import test_response
+
+ITERATIONS = 20
+
+
+def save_book_analysis_rowwise(data, title, author, book_id):
+    """The previous persistence path: one INSERT per row, no transaction. Kept here for comparison."""
+    main_arg_data = data.get('main_argument', {})
+    main_argument = MainArgument.objects.create(**main_arg_data)
+
+    framework_data = data.get('framework', {})
+    framework = Framework.objects.create(
+        name=framework_data.get('name', ''),
+        overview=framework_data.get('overview', ''),
+        visual_representation=framework_data.get('visual_representation')
+    )
+    for component_data in framework_data.get('components', []):
+        FrameworkComponent.objects.create(framework=framework, **component_data)
+
+    key_insights = [KeyInsight.objects.create(**insight_data) for insight_data in data.get('key_insights', [])]
+
+    impl_guide_data = data.get('implementation_guide', {})
+    implementation_guide = ImplementationGuide.objects.create(overview=impl_guide_data.get('overview', ''))
+    for step_data in impl_guide_data.get('steps', []):
+        ImplementationStep.objects.create(guide=implementation_guide, **step_data)
+    ImplementationMeta.objects.create(
+        guide=implementation_guide,
+        common_pitfalls=impl_guide_data.get('common_pitfalls', []),
+        quick_wins=impl_guide_data.get('quick_wins', [])
+    )
+
+    one_page_summary = OnePageSummary.objects.create(**data.get('one_page_summary', {}))
+    book_analysis = BookAnalysisResponse.objects.create(
+        book_id=book_id,
+        book_title=title,
+        book_author=author,
+        main_argument=main_argument,
+        framework=framework,
+        implementation_guide=implementation_guide,
+        one_page_summary=one_page_summary
+    )
+    book_analysis.key_insights.set(key_insights)
+    return book_analysis
+
+
+def measure(label, save_func):
+    query_counts = []
+    started = time.perf_counter()
+    for i in range(ITERATIONS):
+        # Roll every run back so the benchmark leaves the database untouched
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                book_analysis = save_func(test_response, "Benchmark Book", "Benchmark Author", f"benchmark_{label}_{i}")
+            if book_analysis is None:
+                raise RuntimeError(f"{label} failed to save the analysis")
+            query_counts.append(len(queries))
+            transaction.set_rollback(True)
+    elapsed = time.perf_counter() - started
+
+    print(f"{label:>10}: {query_counts[0]} queries per book, {elapsed / ITERATIONS * 1000:.1f} ms per book")
+    return query_counts[0], elapsed
+
+
+def run_benchmark():
+    print(f"Saving summary_response_example.test_response {ITERATIONS} times per path\n")
+    rowwise_queries, rowwise_time = measure("row-wise", save_book_analysis_rowwise)
+    bulk_queries, bulk_time = measure("bulk", save_book_analysis)
+
+    print(f"\nRound trips: {rowwise_queries} -> {bulk_queries}")
+    print(f"Wall time speedup: {rowwise_time / bulk_time:.2f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -2,9 +2,10 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import Post, PostMedia
+from .models import Post, PostMedia, BlogGenerationJob
 # Register your models here.
 
 admin.site.register(Post)
 admin.site.register(PostMedia)
+admin.site.register(BlogGenerationJob)
 
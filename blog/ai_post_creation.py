@@ -1,11 +1,17 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from google.genai import types
 from books.AI_MODELS import GEMINI_CLIENT
+from .models import PostMedia
 
 # Initialize Gemini client
 
+# Image generations in flight at once for a single post
+IMAGE_WORKERS = 4
+
 # Pydantic-like schema for structured output
 BlogStructureSchema = {
     "type": "object",
@@ -216,72 +222,81 @@ cover_image: {image_paths['cover']}
     
     return markdown
 
-def generate_blog_post(keyword, output_dir="blog_posts"):
-    """Main function to generate complete blog post"""
+def report_stage(progress, stage, state, **details):
+    if progress is not None:
+        progress(stage, state, **details)
+
+def generate_image_file(generate, args, name):
+    """Generate one image and upload it to the media storage. Returns the stored name."""
+    image_bytes = generate(*args)
+    return default_storage.save(name, ContentFile(image_bytes))
+
+def generate_blog_images(blog_data, keyword, post_slug, progress=None):
+    """
+    Generate the cover and section images concurrently on a bounded pool and upload them
+    to the media storage, each recorded as a PostMedia row.
+    Returns the image URLs in section order, as compile_blog_markdown expects.
+    """
+    image_dir = f"images/generated_blogs/{post_slug}"
+    tasks = [(generate_cover_image, (blog_data['cover_image_prompt'], keyword), f"{image_dir}/cover.jpg")]
+
+    section_images_needed = [s for s in blog_data['sections'] if s.get('needs_image')]
+    for idx, section in enumerate(section_images_needed):
+        if section.get('image_prompt'):
+            tasks.append((generate_section_image, (section['image_prompt'], section['heading']), f"{image_dir}/section_{idx+1}.jpg"))
+
+    print(f"🎨 Generating cover and {len(tasks) - 1} section images...")
+    names = []
+    with ThreadPoolExecutor(max_workers=min(IMAGE_WORKERS, len(tasks))) as executor:
+        futures = [executor.submit(generate_image_file, *task) for task in tasks]
+        try:
+            for future in futures:
+                names.append(future.result())
+                report_stage(progress, "images", "progress", done=len(names), total=len(tasks))
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+    # Rows are created here rather than in the pool threads so no extra DB connections are opened
+    urls = [PostMedia.objects.create(media=name).media.url for name in names]
+    return {
+        'cover': urls[0],
+        'sections': urls[1:]
+    }
+
+def generate_blog_post(keyword, progress=None):
+    """
+    Main function to generate complete blog post.
+    Images go to the media storage; the markdown and blog data are returned for the
+    caller to keep, nothing is written to the local filesystem.
+    progress, if given, is called as progress(stage, state, **details) for the
+    "structure", "images" and "markdown" stages.
+    """
     print(f"🚀 Generating blog post for keyword: {keyword}")
     
-    # Create output directory
-    output_path = Path(output_dir)
-    output_path.mkdir(exist_ok=True)
-    
     # Generate blog structure
     print("📝 Creating blog structure...")
+    report_stage(progress, "structure", "started")
     blog_data = generate_blog_structure(keyword)
+    report_stage(progress, "structure", "completed")
     
-    # Create subdirectory for this post
-    post_slug = blog_data['slug']
-    post_dir = output_path / post_slug
-    post_dir.mkdir(exist_ok=True)
-    
-    # Generate cover image
-    print("🖼️  Generating cover image...")
-    cover_image_bytes = generate_cover_image(blog_data['cover_image_prompt'], keyword)
-    cover_image_path = post_dir / "cover.jpg"
-    with open(cover_image_path, "wb") as f:
-        f.write(cover_image_bytes)
-    
-    # Generate section images
-    image_paths = {
-        'cover': './cover.jpg',
-        'sections': []
-    }
-    
-    section_images_needed = [s for s in blog_data['sections'] if s.get('needs_image')]
-    print(f"🎨 Generating {len(section_images_needed)} section images...")
-    
-    for idx, section in enumerate(section_images_needed):
-        if section.get('image_prompt'):
-            img_bytes = generate_section_image(section['image_prompt'], section['heading'])
-            img_path = post_dir / f"section_{idx+1}.jpg"
-            with open(img_path, "wb") as f:
-                f.write(img_bytes)
-            image_paths['sections'].append(f"./section_{idx+1}.jpg")
+    # Generate cover and section images
+    report_stage(progress, "images", "started")
+    image_urls = generate_blog_images(blog_data, keyword, blog_data['slug'], progress)
+    report_stage(progress, "images", "completed")
     
     # Compile markdown
     print("📄 Compiling markdown...")
-    markdown_content = compile_blog_markdown(blog_data, keyword, image_paths)
-    
-    # Save markdown file
-    markdown_path = post_dir / f"{post_slug}.md"
-    with open(markdown_path, "w", encoding="utf-8") as f:
-        f.write(markdown_content)
-    
-    # Save metadata
-    metadata_path = post_dir / "metadata.json"
-    with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump(blog_data, f, indent=2)
+    report_stage(progress, "markdown", "started")
+    markdown_content = compile_blog_markdown(blog_data, keyword, image_urls)
+    report_stage(progress, "markdown", "completed")
     
     print(f"✅ Blog post generated successfully!")
-    print(f"📁 Location: {post_dir}")
-    print(f"📊 Stats:")
-    # print(f"   - Sections: {len(blog_data['sections'])}")
-    # print(f"   - Images: {len(image_paths['sections']) + 1}")
-    # print(f"   - BookFlow promotion: {'Yes' if blog_data['should_promote_bookflow'] else 'No'}")
-    # print(f"   - Reading time: ~{blog_data.get('reading_time', 5)} minutes")
     
     return {
-        'post_dir': str(post_dir),
-        'markdown_path': str(markdown_path),
+        'markdown': markdown_content,
+        'images': image_urls,
         'blog_data': blog_data
     }
 
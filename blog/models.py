@@ -1,4 +1,7 @@
-from django.db import models
+import re
+from django.db import IntegrityError, models, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
 from account.utils import generate_id
 from django.utils.text import slugify
 import random
@@ -13,6 +16,20 @@ status = (
 )
 
 
+# Attempts to allocate and save a unique slug before giving up on concurrent collisions
+SLUG_ALLOCATION_ATTEMPTS = 5
+# Longer digit runs at the end of a slug are part of the title (dates, ids), not a collision suffix
+SLUG_SUFFIX_PATTERN = "-[0-9]{1,9}"
+
+
+blog_generation_status = (
+    ("pending", "pending"),
+    ("running", "running"),
+    ("completed", "completed"),
+    ("failed", "failed"),
+)
+
+
 def random_created_date():
     now = timezone.now()
     three_months_ago = now - timedelta(days=90)
@@ -37,16 +54,46 @@ class Post(models.Model):
     updated_at = models.DateTimeField(blank=True, null=True)
 
     def save(self, *args, **kwargs):
-        if self.title:
-            base_slug = slugify(self.title)  # removes special chars, spaces → "-"
-            slug = base_slug
-            num = 1
-            # ensure unique slug
-            while Post.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{num}"
-                num += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        if not self.title:
+            return super().save(*args, **kwargs)
+
+        base_slug = slugify(self.title)  # removes special chars, spaces → "-"
+        for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+            # An edit that keeps the title keeps its slug
+            if attempt or not self.slug_matches(base_slug):
+                self.slug = self.allocate_slug(base_slug)
+            try:
+                # Savepoint so a lost race on the unique slug can be retried inside outer transactions
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # A concurrent save took the slug between allocation and insert
+                if attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                    raise
+
+    def slug_matches(self, base_slug):
+        return bool(self.slug) and (
+            self.slug == base_slug or re.fullmatch(re.escape(base_slug) + SLUG_SUFFIX_PATTERN, self.slug) is not None
+        )
+
+    def allocate_slug(self, base_slug):
+        """
+        Next free slug for base_slug in one query: base_slug itself if unused, otherwise
+        base_slug-<highest numeric suffix + 1>.
+        """
+        suffix_pattern = f"^{re.escape(base_slug)}{SLUG_SUFFIX_PATTERN}$"
+        taken = Post.objects.exclude(pk=self.pk).filter(
+            Q(slug=base_slug) | Q(slug__regex=suffix_pattern)
+        ).aggregate(
+            exact=Count("pk", filter=Q(slug=base_slug)),
+            highest=Max(
+                Cast(Substr("slug", len(base_slug) + 2), BigIntegerField()),
+                filter=Q(slug__regex=suffix_pattern),
+            ),
+        )
+        if not taken["exact"]:
+            return base_slug
+        return f"{base_slug}-{(taken['highest'] or 0) + 1}"
 
     def __str__(self):
         return self.title or ""
@@ -55,4 +102,28 @@ class PostMedia(models.Model):
     media = models.ImageField(upload_to='images/', blank=True, null=True)
     def __str__(self):
         return self.media.url or ""
-    
+
+
+class BlogGenerationJob(models.Model):
+    """
+    One background run of ai_post_creation.generate_blog_post. stages holds per-stage
+    status and timings, e.g. {"images": {"status": "running", "started_at": ..., "done": 2, "total": 4}}.
+    """
+    id = models.CharField(
+        primary_key=True,
+        default=generate_id(),
+        editable=False,
+        blank=True,
+        max_length=100
+    )
+    keyword = models.CharField(max_length=500)
+    status = models.CharField(max_length=20, choices=blog_generation_status, default="pending")
+    stages = models.JSONField(default=dict)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.keyword} ({self.status})"
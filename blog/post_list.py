@@ -0,0 +1,78 @@
+"""
+Lightweight, cached blog index.
+
+The list returns only the fields the index renders (no markdown content), read with
+.values() so no Post instances are built. Rendered pages are kept in the shared
+"persistent" cache under a version key that signals.py bumps whenever a Post is saved
+or deleted, so every cached page goes stale at once without tracking individual keys.
+"""
+import uuid
+from django.core.cache import caches
+from rest_framework.pagination import PageNumberPagination
+from .models import Post
+
+LIST_FIELDS = ("id", "title", "slug", "exerpt", "headerImage", "status", "created_at", "updated_at")
+LIST_CACHE_TIMEOUT = 60 * 60 * 24
+LIST_VERSION_KEY = "blog:posts_list:version"
+
+
+class PostListPagination(PageNumberPagination):
+    page_size = 12
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+def get_list_cache():
+    return caches["persistent"]
+
+
+def get_list_version():
+    version = get_list_cache().get(LIST_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        # add() so concurrent first readers agree on one version
+        get_list_cache().add(LIST_VERSION_KEY, version, None)
+        version = get_list_cache().get(LIST_VERSION_KEY, version)
+    return version
+
+
+def invalidate_post_list():
+    get_list_cache().set(LIST_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def list_cache_key(request):
+    """Keyed on the page and page size only, so other query parameters can't fan out the cache."""
+    paginator = PostListPagination()
+    page = request.query_params.get(paginator.page_query_param, 1)
+    try:
+        page = int(page)
+    except (TypeError, ValueError):
+        # "last" is a page too; anything else is a 404 and never gets cached
+        page = page if page in paginator.last_page_strings else "invalid"
+    return f"blog:posts_list:{get_list_version()}:{page}:{paginator.get_page_size(request)}"
+
+
+def header_image_url(name):
+    if not name:
+        return None
+    return Post._meta.get_field("headerImage").storage.url(name)
+
+
+def get_post_list_page(request):
+    """Paginated response data for the blog index, served from cache when possible."""
+    key = list_cache_key(request)
+    data = get_list_cache().get(key)
+    if data is not None:
+        return data
+
+    paginator = PostListPagination()
+    rows = paginator.paginate_queryset(
+        Post.objects.order_by("-created_at", "-id").values(*LIST_FIELDS),
+        request,
+    )
+    for row in rows:
+        row["headerImage"] = header_image_url(row["headerImage"])
+    data = paginator.get_paginated_response(rows).data
+
+    get_list_cache().set(key, data, LIST_CACHE_TIMEOUT)
+    return data
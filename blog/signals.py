@@ -0,0 +1,13 @@
+"""Drop the cached blog index pages whenever a post changes, once the change is committed."""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Post
+from .post_list import invalidate_post_list
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_list_on_change(sender, **kwargs):
+    # On commit, so a reader can't re-cache the pre-change page under the new version
+    transaction.on_commit(invalidate_post_list)
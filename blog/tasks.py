@@ -0,0 +1,75 @@
+import logging
+from datetime import timedelta
+from django.utils import timezone
+from books.task_queue import task
+from .ai_post_creation import generate_blog_post
+from .models import BlogGenerationJob
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgress:
+    """Records stage status and timings on a BlogGenerationJob as generate_blog_post reports them."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.stages = {}
+        self.started = {}
+
+    def __call__(self, stage, state, **details):
+        now = timezone.now()
+        entry = self.stages.setdefault(stage, {})
+        if state == "started":
+            self.started[stage] = now
+            entry.update(status="running", started_at=now.isoformat())
+        elif state == "completed":
+            entry.update(
+                status="completed",
+                finished_at=now.isoformat(),
+                seconds=round((now - self.started[stage]).total_seconds(), 2),
+            )
+        entry.update(details)
+        self.save()
+
+    def fail_running(self):
+        for entry in self.stages.values():
+            if entry.get("status") == "running":
+                entry["status"] = "failed"
+        self.save()
+
+    def save(self):
+        BlogGenerationJob.objects.filter(pk=self.job_id).update(stages=self.stages)
+
+
+@task(visibility_timeout=timedelta(minutes=20))
+def run_blog_generation(job_id):
+    """
+    The generated markdown and blog data are kept on the job's result, images in the media
+    storage. Failures are recorded on the job and re-raised so the task queue retries the generation.
+    """
+    job = BlogGenerationJob.objects.get(pk=job_id)
+    BlogGenerationJob.objects.filter(pk=job_id).update(
+        status="running", error=None, started_at=timezone.now(), finished_at=None
+    )
+    progress = JobProgress(job_id)
+    try:
+        result = generate_blog_post(job.keyword, progress=progress)
+    except Exception as E:
+        logger.error(f"Blog generation failed for '{job.keyword}': {E}")
+        progress.fail_running()
+        BlogGenerationJob.objects.filter(pk=job_id).update(status="failed", error=str(E), finished_at=timezone.now())
+        raise
+
+    BlogGenerationJob.objects.filter(pk=job_id).update(status="completed", result=result, finished_at=timezone.now())
+    return True
+
+
+def SCHEDULE_BLOG_GENERATION(keyword):
+    job = BlogGenerationJob.objects.create(keyword=keyword)
+
+    try:
+        run_blog_generation.enqueue(job.id)
+    except Exception as E:
+        BlogGenerationJob.objects.filter(pk=job.id).update(status="failed", error=str(E), finished_at=timezone.now())
+        raise
+    return job
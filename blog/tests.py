@@ -1,3 +1,31 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Post
+
+
+class SlugAllocationTests(TestCase):
+    def create_post(self, title):
+        return Post.objects.create(title=title, exerpt="", content="")
+
+    def test_collision_gets_the_next_suffix(self):
+        self.assertEqual(self.create_post("Deep Work").slug, "deep-work")
+        self.assertEqual(self.create_post("Deep Work").slug, "deep-work-1")
+        self.assertEqual(self.create_post("Deep Work").slug, "deep-work-2")
+
+    def test_title_ending_in_digits_keeps_its_digits(self):
+        self.assertEqual(self.create_post("Top 10").slug, "top-10")
+        self.assertEqual(self.create_post("Top 10").slug, "top-10-1")
+        # "top-10" belongs to another title, not to "top"
+        self.assertEqual(self.create_post("Top").slug, "top")
+
+    def test_long_digit_runs_are_not_read_as_suffixes(self):
+        self.assertEqual(self.create_post("Post 20260101123456789").slug, "post-20260101123456789")
+        self.assertEqual(self.create_post("Post").slug, "post")
+        self.assertEqual(self.create_post("Post").slug, "post-1")
+
+    def test_edit_that_keeps_the_title_keeps_the_slug(self):
+        self.create_post("Deep Work")
+        post = self.create_post("Deep Work")
+        post.content = "Edited"
+        post.save()
+        self.assertEqual(Post.objects.get(pk=post.pk).slug, "deep-work-1")
@@ -9,6 +9,7 @@ urlpatterns = [
     path("posts/", views.posts_list, name="posts_list"),
     path("posts/<str:pk>/", views.post_detail, name="post_detail"),
     path("generate-ai-post/", views.generate_ai_blog_post, name="generate_ai_blog_post"),
+    path("generate-ai-post/<str:job_id>/", views.get_ai_blog_post_job, name="get_ai_blog_post_job"),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
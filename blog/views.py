@@ -5,27 +5,25 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import PostSerializer
-from .models import Post
+from .models import Post, BlogGenerationJob
 import os 
 from django_ratelimit.decorators import ratelimit
 from django.views.decorators.cache import cache_page
 import json
 from pathlib import Path
-from .ai_post_creation import generate_blog_post
+from .tasks import SCHEDULE_BLOG_GENERATION
+from .post_list import get_post_list_page
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
 
-# GET all posts, POST create new post
+# GET paginated post list (no content, cached until a post changes), POST create new post
 # @ratelimit(key='ip', rate='50/1d')
-# @cache_page(60 * 60)
 @api_view(["GET", "POST"])
 def posts_list(request):
     if request.method == "GET":
-        posts = Post.objects.all().order_by("-created_at")
-        serializer = PostSerializer(posts, many=True)
-        return Response(serializer.data)
+        return Response(get_post_list_page(request))
 
     elif request.method == "POST":
         data = request.data
@@ -69,12 +67,14 @@ def post_detail(request, pk):
 @api_view(['POST'])
 def generate_ai_blog_post(request):
     """
-    Generate an AI blog post based on a keyword.
+    Start generating an AI blog post for a keyword in the background.
     
     Expected payload:
     {
         "keyword": "your topic here"
     }
+
+    Responds 202 with the job id; poll generate-ai-post/<job_id>/ for progress and the result.
     """
     keyword = request.data.get('keyword')
     
@@ -85,14 +85,12 @@ def generate_ai_blog_post(request):
         )
         
     try:
-        # Generate the blog post
-        # The output_dir is relative to where the script runs, usually base dir
-        result = generate_blog_post(keyword, output_dir=os.path.join(BASE_DIR, 'media', 'generated_blogs'))
+        job = SCHEDULE_BLOG_GENERATION(keyword)
         
         return Response({
-            "message": "Blog post generated successfully",
-            "data": result
-        }, status=status.HTTP_200_OK)
+            "message": "Blog post generation started",
+            "data": {"job_id": job.id, "status": job.status}
+        }, status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         return Response(
@@ -100,3 +98,26 @@ def generate_ai_blog_post(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+@api_view(['GET'])
+def get_ai_blog_post_job(request, job_id):
+    """Status, per-stage progress and timings, and the result once completed, of a blog generation job."""
+    try:
+        job = BlogGenerationJob.objects.get(pk=job_id)
+    except BlogGenerationJob.DoesNotExist:
+        return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        "message": job.status,
+        "data": {
+            "job_id": job.id,
+            "keyword": job.keyword,
+            "status": job.status,
+            "stages": job.stages,
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+    }, status=status.HTTP_200_OK)
@@ -190,6 +190,23 @@ DATABASES = {
 }
 
 
+# Cache
+# "persistent" is shared by every web worker and survives restarts.
+# Create its table with: python manage.py createcachetable
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "persistent": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "bookflow_cache",
+        "OPTIONS": {
+            "MAX_ENTRIES": 50000,
+        },
+    },
+}
+
+
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
 CLOUDINARY_STORAGE = {
@@ -244,6 +261,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 GOOGLE_BOOKS_API_KEY = os.getenv("GOOGLE_BOOKS_API_KEY", default="")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", default="")
+# Optional override of the Gemini API endpoint, e.g. a local fake server for load tests
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", default="")
 
 # APScheduler Configuration
 APSCHEDULER_DATETIME_FORMAT = "N j, Y, f:s a"
@@ -1,4 +1,5 @@
 from google import genai
+from google.genai import types
 from django.conf import settings
 import logging
 
@@ -10,5 +11,8 @@ import logging
 # logging.getLogger('urllib3').setLevel(logging.WARNING)
 # logging.getLogger('httpx').setLevel(logging.WARNING)
 
-GEMINI_CLIENT = genai.Client(api_key=settings.GOOGLE_API_KEY)
+GEMINI_CLIENT = genai.Client(
+    api_key=settings.GOOGLE_API_KEY,
+    http_options=types.HttpOptions(base_url=settings.GEMINI_BASE_URL) if settings.GEMINI_BASE_URL else None,
+)
 
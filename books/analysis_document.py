@@ -0,0 +1,44 @@
+"""
+Materialized (denormalized) form of a BookAnalysisResponse.
+
+The full nested serializer output is stored on BookAnalysisResponse.document when the
+analysis is saved and refreshed whenever one of its related rows changes (see signals.py),
+so reads are a single lookup by book_id with no nested serializer work.
+"""
+import json
+from .models import BookAnalysisResponse
+from .serializers import BookAnalysisResponseSerializer
+
+
+def build_analysis_document(book_analysis):
+    """Serialize an analysis with the nested serializer into plain JSON-ready data."""
+    return json.loads(json.dumps(BookAnalysisResponseSerializer(book_analysis).data))
+
+
+def refresh_analysis_document(book_analysis_id):
+    book_analysis = BookAnalysisResponseSerializer.get_queryset().filter(pk=book_analysis_id).first()
+    if book_analysis is None:
+        return None
+    document = build_analysis_document(book_analysis)
+    # .update() so the refresh doesn't fire post_save again
+    BookAnalysisResponse.objects.filter(pk=book_analysis_id).update(document=document)
+    return document
+
+
+def refresh_analysis_documents(book_analysis_ids):
+    for book_analysis_id in set(book_analysis_ids):
+        refresh_analysis_document(book_analysis_id)
+
+
+def get_analysis_document(book_id):
+    """
+    Return the materialized summary for book_id, or None if the book hasn't been summarized.
+    Analyses saved before the document column existed are materialized on first read.
+    """
+    row = BookAnalysisResponse.objects.filter(book_id=book_id).values_list("id", "document").first()
+    if row is None:
+        return None
+    book_analysis_id, document = row
+    if document is None:
+        document = refresh_analysis_document(book_analysis_id)
+    return document
@@ -1,7 +1,4 @@
 from django.apps import AppConfig
-import logging
-
-logger = logging.getLogger(__name__)
 
 
 class BooksConfig(AppConfig):
@@ -9,22 +6,7 @@ class BooksConfig(AppConfig):
     name = "books"
 
     def ready(self):
-        """
-        Initialize the background scheduler when Django starts.
-        This scheduler handles one-off async tasks like book summary generation.
-        """
-        # Only start the scheduler if this is not a management command
-        # and not during migrations
-        import sys
-
-        # Don't start scheduler during migrations, collectstatic, or the scheduler command itself
-        if 'migrate' not in sys.argv and 'collectstatic' not in sys.argv and 'scheduler' not in sys.argv:
-            try:
-                from .scheduler import scheduler
-
-                # Only start if not already running
-                if not scheduler.running:
-                    scheduler.start()
-                    logger.info("Background scheduler started successfully for async tasks.")
-            except Exception as e:
-                logger.error(f"Failed to start background scheduler: {e}")
+        # Keeps BookAnalysisResponse.document in sync with its related rows
+        from . import signals  # noqa: F401
+        # One-off background work (book summaries, free trials, blog generation, outreach) is
+        # queued as BackgroundTask rows and run by `python manage.py task_worker`, not in web processes.
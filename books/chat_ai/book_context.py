@@ -0,0 +1,74 @@
+"""
+Chat prompt context resolved on the server from the stored book analysis.
+
+Clients used to upload the summary, key insights and practical takeaways with every chat
+message. When the book has a BookAnalysisResponse the same text is assembled from its
+materialized document instead, so a chat frame only needs book_id and user_message.
+"""
+from ..analysis_document import get_analysis_document
+
+
+def _lines(items, prefix="- "):
+    return "\n".join(f"{prefix}{item}" for item in items if item)
+
+
+def build_book_context(document):
+    main_argument = document.get("main_argument") or {}
+    framework = document.get("framework") or {}
+    one_page_summary = document.get("one_page_summary") or {}
+    implementation_guide = document.get("implementation_guide") or {}
+
+    summary = "\n\n".join(part for part in [
+        one_page_summary.get("headline"),
+        one_page_summary.get("core_message"),
+        main_argument.get("problem_identified"),
+        main_argument.get("solution_proposed"),
+        main_argument.get("why_it_matters"),
+        f"{framework.get('name')}: {framework.get('overview')}" if framework.get("name") else framework.get("overview"),
+        _lines(one_page_summary.get("key_principles") or []),
+        one_page_summary.get("bottom_line"),
+    ] if part)
+
+    key_insights = _lines(
+        f"{insight.get('title')}: {insight.get('description')}"
+        for insight in document.get("key_insights") or []
+    )
+
+    practical_takeaways = "\n".join(part for part in [
+        _lines(one_page_summary.get("actionable_takeaways") or []),
+        _lines(implementation_guide.get("quick_wins") or []),
+        _lines(
+            insight.get("practical_application")
+            for insight in document.get("key_insights") or []
+        ),
+    ] if part)
+
+    return {
+        "book_title": document.get("book_title"),
+        "author": document.get("book_author"),
+        "summary": summary,
+        "key_insights": key_insights,
+        "practical_takeaways": practical_takeaways,
+    }
+
+
+def resolve_book_context(book_id):
+    """Prompt context for book_id from its stored analysis, or None if the book hasn't been summarized."""
+    document = get_analysis_document(book_id)
+    if document is None:
+        return None
+    return build_book_context(document)
+
+
+def client_book_context(data):
+    """Fallback context from client-supplied fields, or None if the required ones are missing."""
+    context = {
+        "book_title": data.get("book_title"),
+        "author": data.get("book_author"),
+        "summary": data.get("summary"),
+        "key_insights": data.get("key_insights") or "",
+        "practical_takeaways": data.get("practical_takeaways") or "",
+    }
+    if not all([context["book_title"], context["author"], context["summary"]]):
+        return None
+    return context
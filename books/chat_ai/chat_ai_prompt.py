@@ -1,3 +1,5 @@
+import hashlib
+
 BOOKFLOW_SYSTEM_PROMPT = """You are the BookFlow AI Assistant, helping users deeply understand and apply knowledge from books. You're currently discussing **{book_title}** by **{author}**.
 
 ## Your Core Purpose
@@ -89,6 +91,9 @@ Validate their thinking → Build on their insight → Connect to book's framewo
 **Remember**: Your goal is to make this book's knowledge truly usable for each individual user. You're not just answering questions—you're facilitating transformation from information to understanding to action.
 """
 
+# Part of the Gemini prompt cache key, editing the template invalidates every cached prompt
+PROMPT_VERSION = hashlib.sha1(BOOKFLOW_SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
 
 def get_bookflow_prompt(book_title, author, book_summary, key_insights, practical_takeaways):
     """
@@ -2,12 +2,14 @@ import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from ..models import ChatHistory
-from .main import generate_ai_chat
+from .book_context import client_book_context, resolve_book_context
+from .main import agenerate_ai_chat, astream_ai_chat
+from .prompt_cache import aget_prompt_cache_name, expire_prompt_cache, is_cache_unavailable_error
+from .streaming import ChatTextDeltaParser
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -18,6 +20,14 @@ class BookChatConsumer(AsyncWebsocketConsumer):
     WebSocket consumer for book chat AI.
 
     Client should send messages in this format:
+    {
+        "type": "chat_message",
+        "book_id": "book_id_here",
+        "user_message": "User's question here"
+    }
+
+    The book context is resolved on the server from the stored analysis for book_id.
+    For books without one, the client has to supply the context itself:
     {
         "type": "chat_message",
         "book_id": "book_id_here",
@@ -42,6 +52,15 @@ class BookChatConsumer(AsyncWebsocketConsumer):
         "status": "success"
     }
 
+    Clients that send "type": "chat_message_stream" (same fields) first receive
+    incremental frames as tokens arrive:
+    {
+        "type": "chat_delta",
+        "delta": "next piece of the AI response",
+        "status": "streaming"
+    }
+    followed by the same final "chat_response" frame.
+
     Or error:
     {
         "type": "error",
@@ -83,6 +102,9 @@ class BookChatConsumer(AsyncWebsocketConsumer):
             await self.close(code=4003)
             return
 
+        # Prompt context per book_id, resolved once for the lifetime of the connection
+        self.book_contexts = {}
+
         # Accept the connection
         await self.accept()
         logger.info(f"WebSocket connected for user: {self.user.email}")
@@ -116,22 +138,35 @@ class BookChatConsumer(AsyncWebsocketConsumer):
 
             # Extract chat data
             book_id = data.get('book_id')
-            book_title = data.get('book_title')
-            book_author = data.get('book_author')
-            summary = data.get('summary')
-            key_insights = data.get('key_insights', '')
-            practical_takeaways = data.get('practical_takeaways', '')
             user_message = data.get('user_message')
 
-            # Validate required fields
-            if not all([book_id, book_title, book_author, summary, user_message]):
+            if not all([book_id, user_message]):
+                await self.send(text_data=json.dumps({
+                    'type': 'error',
+                    'message': 'Missing required fields: book_id, user_message',
+                    'status': 'error'
+                }))
+                return
+
+            # Stored analysis first, client-supplied context for books without one.
+            # Only server-resolved prompts go through the Gemini prompt cache.
+            cached_content = None
+            book_context = await self.get_book_context(book_id)
+            if book_context is not None:
+                cached_content = await aget_prompt_cache_name(book_id, book_context)
+            else:
+                book_context = client_book_context(data)
+            if book_context is None:
                 await self.send(text_data=json.dumps({
                     'type': 'error',
-                    'message': 'Missing required fields: book_id, book_title, book_author, summary, user_message',
+                    'message': 'No stored summary for this book, send book_title, book_author and summary',
                     'status': 'error'
                 }))
                 return
 
+            book_title = book_context['book_title']
+            book_author = book_context['author']
+
             # Send processing status
             await self.send(text_data=json.dumps({
                 'type': 'processing',
@@ -139,16 +174,14 @@ class BookChatConsumer(AsyncWebsocketConsumer):
                 'status': 'processing'
             }))
 
-            # Generate AI response (run in thread pool to avoid blocking)
+            chat_kwargs = {'user_input': user_message, 'cached_content': cached_content, **book_context}
+
+            # Generate AI response on the async Gemini client so no worker thread is held per chat
             try:
-                ai_response_json = await sync_to_async(generate_ai_chat)(
-                    user_input=user_message,
-                    book_title=book_title,
-                    author=book_author,
-                    summary=summary,
-                    key_insights=key_insights,
-                    practical_takeaways=practical_takeaways
-                )
+                if message_type == 'chat_message_stream':
+                    ai_response_json = await self.stream_ai_response(chat_kwargs)
+                else:
+                    ai_response_json = await self.generate_ai_response(chat_kwargs)
             except Exception as ai_error:
                 logger.error(f"AI Generation Error: {ai_error}")
                 await self.send(text_data=json.dumps({
@@ -188,8 +221,8 @@ class BookChatConsumer(AsyncWebsocketConsumer):
                 await self.send(text_data=json.dumps({
                     'type': 'chat_response',
                     'data': {
-                        'id': chat_history.id,
-                        'user': self.user.id,
+                        'id': str(chat_history.id),
+                        'user': str(self.user.id),
                         'book_id': book_id,
                         'book_title': book_title,
                         'book_author': book_author,
@@ -234,6 +267,53 @@ class BookChatConsumer(AsyncWebsocketConsumer):
                 'status': 'error'
             }))
 
+    async def generate_ai_response(self, chat_kwargs):
+        try:
+            return await agenerate_ai_chat(**chat_kwargs)
+        except Exception as cache_error:
+            if not chat_kwargs['cached_content'] or not is_cache_unavailable_error(cache_error):
+                raise
+            # The cached prompt was evicted or expired early, resend it in full
+            await self.drop_prompt_cache(chat_kwargs['cached_content'], cache_error)
+            return await agenerate_ai_chat(**{**chat_kwargs, 'cached_content': None})
+
+    async def stream_ai_response(self, chat_kwargs):
+        """Send chat_delta frames while Gemini streams the response, return the full JSON text"""
+        parser = ChatTextDeltaParser()
+        try:
+            await self.send_ai_deltas(parser, chat_kwargs)
+        except Exception as cache_error:
+            # Retrying is only safe before the client has seen any part of the answer
+            if not chat_kwargs['cached_content'] or parser.buffer or not is_cache_unavailable_error(cache_error):
+                raise
+            await self.drop_prompt_cache(chat_kwargs['cached_content'], cache_error)
+            await self.send_ai_deltas(parser, {**chat_kwargs, 'cached_content': None})
+
+        return parser.buffer
+
+    async def drop_prompt_cache(self, cache_name, cache_error):
+        logger.warning(f"Cached chat prompt {cache_name} is gone, sending the full prompt: {cache_error}")
+        await database_sync_to_async(expire_prompt_cache)(cache_name)
+
+    async def send_ai_deltas(self, parser, chat_kwargs):
+        async for fragment in astream_ai_chat(**chat_kwargs):
+            delta = parser.feed(fragment)
+            if delta:
+                await self.send(text_data=json.dumps({
+                    'type': 'chat_delta',
+                    'delta': delta,
+                    'status': 'streaming'
+                }))
+
+    async def get_book_context(self, book_id):
+        """Server-side context for book_id, cached on the connection once the book has an analysis"""
+        if book_id not in self.book_contexts:
+            book_context = await database_sync_to_async(resolve_book_context)(book_id)
+            if book_context is None:
+                return None
+            self.book_contexts[book_id] = book_context
+        return self.book_contexts[book_id]
+
     @database_sync_to_async
     def get_user(self, user_id):
         """Get user from database"""
@@ -1,31 +1,73 @@
 from ..AI_MODELS import GEMINI_CLIENT
 from .chat_ai_prompt import get_bookflow_prompt
 from .response_format import ChatResponse
+def prompt_content(book_title, author, summary, key_insights, practical_takeaways):
+    return {
+        "role": "model",
+        "parts": [
+            {"text": f"{get_bookflow_prompt(book_title, author, summary, key_insights, practical_takeaways)}"}
+        ]
+    }
+
+def user_content(user_input):
+    return {
+        "role": "user",
+        "parts": [
+            {"text": user_input}
+        ]
+    }
+
 def add_content(user_input, book_title, author, summary, key_insights, practical_takeaways):
     converstaion = [
-        {
-            "role": "model",
-            "parts": [
-                {"text": f"{get_bookflow_prompt(book_title, author, summary, key_insights, practical_takeaways)}"}
-            ]
-        },
-        {
-            "role": "user",
-            "parts": [
-                {"text": user_input}
-            ]
-        }
+        prompt_content(book_title, author, summary, key_insights, practical_takeaways),
+        user_content(user_input),
     ]
     return converstaion
 
-def generate_ai_chat(user_input, book_title, author, summary, key_insights, practical_takeaways):
+CHAT_MODEL = "gemini-2.5-flash"
+CHAT_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": ChatResponse,
+}
+
+def chat_request(user_input, book_title, author, summary, key_insights, practical_takeaways, cached_content=None):
+    """
+    Contents and config for one chat turn. With cached_content (see prompt_cache.py) the
+    system prompt is already held by Gemini, so only the user's message is sent.
+    """
+    if cached_content:
+        return [user_content(user_input)], {**CHAT_CONFIG, "cached_content": cached_content}
+    return add_content(user_input, book_title, author, summary, key_insights, practical_takeaways), CHAT_CONFIG
+
+def generate_ai_chat(user_input, book_title, author, summary, key_insights, practical_takeaways, cached_content=None):
+    contents, config = chat_request(user_input, book_title, author, summary, key_insights, practical_takeaways, cached_content)
     response = GEMINI_CLIENT.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=add_content(user_input, book_title, author, summary, key_insights, practical_takeaways),
-        config={
-        "response_mime_type": "application/json",
-        "response_schema": ChatResponse,
-    },
+        model=CHAT_MODEL,
+        contents=contents,
+        config=config,
+    )
+
+    return response.text
+
+async def agenerate_ai_chat(user_input, book_title, author, summary, key_insights, practical_takeaways, cached_content=None):
+    """Async variant of generate_ai_chat, runs on the event loop instead of a worker thread"""
+    contents, config = chat_request(user_input, book_title, author, summary, key_insights, practical_takeaways, cached_content)
+    response = await GEMINI_CLIENT.aio.models.generate_content(
+        model=CHAT_MODEL,
+        contents=contents,
+        config=config,
     )
 
     return response.text
+
+async def astream_ai_chat(user_input, book_title, author, summary, key_insights, practical_takeaways, cached_content=None):
+    """Yields the raw ChatResponse JSON in fragments as Gemini generates it"""
+    contents, config = chat_request(user_input, book_title, author, summary, key_insights, practical_takeaways, cached_content)
+    stream = await GEMINI_CLIENT.aio.models.generate_content_stream(
+        model=CHAT_MODEL,
+        contents=contents,
+        config=config,
+    )
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
@@ -0,0 +1,227 @@
+"""
+Per-book Gemini context cache for the chat system prompt.
+
+The BookFlow system prompt embeds the whole book context, several thousand tokens that
+every chat turn used to resend. For books with a stored analysis the prompt is uploaded
+once with Gemini's cached-content API and chat turns reference it by name, keyed by
+book_id and PROMPT_VERSION (see ChatPromptCache).
+
+- A hit that is close to expiry renews the TTL, so caches of books being chatted about stay alive.
+- Caches that aren't used simply expire on Gemini's side. evict_chat_prompt_caches() deletes the
+  caches of older prompt versions and the least recently used ones past MAX_CACHED_BOOKS.
+  Expired rows are kept so their hit/miss counters survive; the next turn recreates the cache.
+- Any failure to get a cache falls back to sending the full prompt. A failed create is not retried
+  for a while (e.g. a prompt below Gemini's minimum cacheable size). A chat turn whose cache
+  turns out to be gone (is_cache_unavailable_error) expires the row and resends in full.
+- miss_count counts every lookup that found no usable cache, including ones that didn't create one.
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from channels.db import database_sync_to_async
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+from google.genai import errors as genai_errors
+from ..AI_MODELS import GEMINI_CLIENT
+from ..models import ChatPromptCache
+from .chat_ai_prompt import PROMPT_VERSION
+from .main import CHAT_MODEL, prompt_content
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = timedelta(hours=1)
+# Hits inside this window before expiry push the expiry out by another CACHE_TTL
+RENEW_WITHIN = timedelta(minutes=15)
+# Don't hand out a cache that may expire while the request is in flight
+EXPIRY_MARGIN = timedelta(minutes=1)
+CREATE_LOCK_TIMEOUT = 60
+FAILED_CREATE_COOLDOWN = 60 * 10
+MAX_CACHED_BOOKS = 200
+
+
+def get_lock_cache():
+    return caches["persistent"]
+
+
+def hash_book_context(book_context):
+    return hashlib.sha1(json.dumps(book_context, sort_keys=True).encode()).hexdigest()
+
+
+def cache_config(book_context=None):
+    config = {"ttl": f"{int(CACHE_TTL.total_seconds())}s"}
+    if book_context is not None:
+        config["contents"] = [prompt_content(**book_context)]
+        config["display_name"] = f"bookflow-chat-{PROMPT_VERSION}"
+    return config
+
+
+def _create_lock_key(book_id):
+    return f"chat_prompt_cache:create:{PROMPT_VERSION}:{book_id}"
+
+
+def _find_fresh_entry(book_id, context_hash):
+    entry = ChatPromptCache.objects.filter(book_id=book_id, prompt_version=PROMPT_VERSION).first()
+    if entry is None or entry.context_hash != context_hash:
+        return None
+    if entry.expires_at <= timezone.now() + EXPIRY_MARGIN:
+        return None
+    return entry
+
+
+def _record_hit(entry):
+    now = timezone.now()
+    ChatPromptCache.objects.filter(pk=entry.pk).update(hit_count=F("hit_count") + 1, last_used_at=now)
+    return entry.expires_at - now < RENEW_WITHIN
+
+
+def _record_renewal(entry):
+    ChatPromptCache.objects.filter(pk=entry.pk).update(expires_at=timezone.now() + CACHE_TTL)
+
+
+def _claim_create(book_id):
+    return get_lock_cache().add(_create_lock_key(book_id), True, CREATE_LOCK_TIMEOUT)
+
+
+def _release_create(book_id, failed):
+    if failed:
+        # Keep the lock as a cooldown so every turn doesn't retry a create that keeps failing
+        get_lock_cache().set(_create_lock_key(book_id), True, FAILED_CREATE_COOLDOWN)
+    else:
+        get_lock_cache().delete(_create_lock_key(book_id))
+
+
+def _record_miss(book_id):
+    """Count a lookup that found no usable cache, whether or not one gets created for it."""
+    entries = ChatPromptCache.objects.filter(book_id=book_id, prompt_version=PROMPT_VERSION)
+    if entries.update(miss_count=F("miss_count") + 1):
+        return
+    try:
+        # Expired placeholder so the miss has a row to be counted on until a cache is created
+        ChatPromptCache.objects.create(
+            book_id=book_id, prompt_version=PROMPT_VERSION, context_hash="", cache_name="", expires_at=timezone.now()
+        )
+    except IntegrityError:
+        entries.update(miss_count=F("miss_count") + 1)
+
+
+def _store_created(book_id, context_hash, cache_name):
+    """Save the new cache, return the name of the one it replaced (stale context) if any."""
+    now = timezone.now()
+    fields = {
+        "context_hash": context_hash,
+        "cache_name": cache_name,
+        "expires_at": now + CACHE_TTL,
+        "last_used_at": now,
+    }
+    entries = ChatPromptCache.objects.filter(book_id=book_id, prompt_version=PROMPT_VERSION)
+    replaced = entries.values_list("cache_name", flat=True).first()
+    if entries.update(**fields):
+        return replaced or None
+    try:
+        ChatPromptCache.objects.create(book_id=book_id, prompt_version=PROMPT_VERSION, **fields)
+    except IntegrityError:
+        entries.update(**fields)
+    return None
+
+
+def expire_prompt_cache(cache_name):
+    """Stop handing out a cache Gemini no longer has; the next turn recreates it."""
+    ChatPromptCache.objects.filter(cache_name=cache_name).update(expires_at=timezone.now())
+
+
+def is_cache_unavailable_error(error):
+    """True for Gemini's errors about cached content that doesn't exist (any more) or has expired."""
+    if not isinstance(error, genai_errors.ClientError):
+        return False
+    message = str(error.message or error).lower()
+    return error.code == 404 or ("cache" in message and ("not found" in message or "expired" in message))
+
+
+async def aget_prompt_cache_name(book_id, book_context):
+    """Name of the Gemini cache holding the chat prompt for this book, or None to send it uncached."""
+    context_hash = hash_book_context(book_context)
+    entry = await database_sync_to_async(_find_fresh_entry)(book_id, context_hash)
+    if entry is not None:
+        if await database_sync_to_async(_record_hit)(entry):
+            try:
+                await GEMINI_CLIENT.aio.caches.update(name=entry.cache_name, config=cache_config())
+                await database_sync_to_async(_record_renewal)(entry)
+            except Exception as e:
+                logger.warning(f"Chat prompt cache renewal failed for {book_id}: {e}")
+        return entry.cache_name
+
+    await database_sync_to_async(_record_miss)(book_id)
+    if not await database_sync_to_async(_claim_create)(book_id):
+        return None
+    try:
+        cached = await GEMINI_CLIENT.aio.caches.create(model=CHAT_MODEL, config=cache_config(book_context))
+    except Exception as e:
+        logger.warning(f"Chat prompt cache create failed for {book_id}: {e}")
+        await database_sync_to_async(_release_create)(book_id, True)
+        return None
+
+    replaced = await database_sync_to_async(_store_created)(book_id, context_hash, cached.name)
+    await database_sync_to_async(_release_create)(book_id, False)
+    if replaced:
+        try:
+            await GEMINI_CLIENT.aio.caches.delete(name=replaced)
+        except Exception as e:
+            # Nothing to clean up if it already expired on Gemini's side
+            logger.warning(f"Failed to delete chat prompt cache {replaced}: {e}")
+    return cached.name
+
+
+def delete_remote_cache(cache_name):
+    try:
+        GEMINI_CLIENT.caches.delete(name=cache_name)
+    except Exception as e:
+        # Nothing to clean up if it already expired on Gemini's side
+        logger.warning(f"Failed to delete chat prompt cache {cache_name}: {e}")
+
+
+def evict_chat_prompt_caches():
+    """
+    Delete caches built from older prompt versions and the least recently used live caches
+    beyond MAX_CACHED_BOOKS, so Gemini storage isn't paid for prompts nobody is chatting with.
+    Run periodically by the scheduler.
+    """
+    now = timezone.now()
+    outdated = list(
+        ChatPromptCache.objects.exclude(prompt_version=PROMPT_VERSION).values_list("pk", "cache_name", "expires_at")
+    )
+    overflow = list(
+        ChatPromptCache.objects.filter(prompt_version=PROMPT_VERSION, expires_at__gt=now)
+        .order_by("-last_used_at")
+        .values_list("pk", "cache_name", "expires_at")[MAX_CACHED_BOOKS:]
+    )
+    for _, cache_name, expires_at in outdated + overflow:
+        if expires_at > now:
+            delete_remote_cache(cache_name)
+
+    ChatPromptCache.objects.filter(pk__in=[pk for pk, _, _ in outdated]).delete()
+    ChatPromptCache.objects.filter(pk__in=[pk for pk, _, _ in overflow]).update(expires_at=now)
+
+    logger.info(f"Evicted chat prompt caches: {len(outdated)} outdated, {len(overflow)} over the cap")
+    return len(outdated) + len(overflow)
+
+
+def get_prompt_cache_metrics():
+    entries = ChatPromptCache.objects.filter(prompt_version=PROMPT_VERSION)
+    totals = entries.aggregate(hits=Sum("hit_count"), misses=Sum("miss_count"))
+    hits = totals["hits"] or 0
+    misses = totals["misses"] or 0
+    return {
+        "prompt_version": PROMPT_VERSION,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "cached_books": entries.count(),
+        "active_caches": entries.filter(expires_at__gt=timezone.now()).count(),
+        "top_books": list(
+            entries.order_by("-hit_count")
+            .values("book_id", "hit_count", "miss_count", "expires_at", "last_used_at")[:20]
+        ),
+    }
@@ -0,0 +1,57 @@
+import json
+import re
+
+
+class ChatTextDeltaParser:
+    """
+    Incrementally pulls the "text" field out of a streamed ChatResponse JSON document.
+
+    Gemini streams the structured response as raw JSON fragments, e.g.
+    '{"text": "Great que', 'stion! The book...', ... '", "noteable": "..."}'.
+    feed() takes each fragment and returns only the newly decoded characters of "text",
+    so clients can render tokens as they arrive.
+    """
+
+    TEXT_START = re.compile(r'"text"\s*:\s*"')
+    # A trailing high surrogate escape must wait for its pair before it can be decoded
+    HIGH_SURROGATE_ESCAPE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}$')
+
+    def __init__(self):
+        self.buffer = ""
+        self.emitted = 0
+        self.text_complete = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        text = self._decoded_text()
+        delta = text[self.emitted:]
+        self.emitted = len(text)
+        return delta
+
+    def _decoded_text(self):
+        match = self.TEXT_START.search(self.buffer)
+        if not match:
+            return ""
+
+        start = match.end()
+        index = raw_end = start
+        length = len(self.buffer)
+        while index < length:
+            char = self.buffer[index]
+            if char == '\\':
+                escape_length = 6 if self.buffer[index + 1:index + 2] == 'u' else 2
+                if index + escape_length > length:
+                    break  # escape sequence split across chunks
+                index += escape_length
+                raw_end = index
+                continue
+            if char == '"':
+                self.text_complete = True
+                break
+            index += 1
+            raw_end = index
+
+        raw = self.buffer[start:raw_end]
+        if not self.text_complete and self.HIGH_SURROGATE_ESCAPE.search(raw):
+            raw = raw[:-6]
+        return json.loads('"' + raw + '"')
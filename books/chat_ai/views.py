@@ -3,10 +3,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import exceptions, status
 import json
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from django_ratelimit.decorators import ratelimit
 from .main import generate_ai_chat
+from .prompt_cache import get_prompt_cache_metrics
 from ..models import ChatHistory, BookAnalysisResponse
+from ..pagination import InvalidCursor, invalid_cursor_response, paginate_by_created
 from ..serializers import ChatHistorySerializer
 
 
@@ -130,19 +132,20 @@ def chat_with_book_ai(request):
 @permission_classes([IsAuthenticated])
 def get_chat_history(request, book_id):
     """
-    GET view to retrieve all chat history for a specific user and book
-    URL: /chat-history/<book_id>/
+    GET view to retrieve chat history for a specific user and book, one page at a time
+    URL: /chat-history/<book_id>/?limit=<page size>&cursor=<next_cursor of the previous page>
     """
     try:
-        # Get all chat history for the user and book, ordered by creation date (newest first)
-        chat_history = ChatHistory.objects.filter(
-            user=request.user,
-            book_id=book_id
-        ).order_by('-created_at')
+        # One page of chat history for the user and book, newest first, served by the (user, book_id, -created_at) index
+        chat_history, next_cursor = paginate_by_created(
+            ChatHistory.objects.filter(user=request.user, book_id=book_id),
+            request
+        )
 
-        if not chat_history.exists():
+        if not chat_history and 'cursor' not in request.query_params:
             return Response({
                 "data": [],
+                "next_cursor": None,
                 "errors": "",
                 "message": "No chat history found for this book",
                 "status": "success",
@@ -153,14 +156,40 @@ def get_chat_history(request, book_id):
 
         return Response({
             "data": serializer.data,
+            "next_cursor": next_cursor,
             "errors": "",
             "message": "Chat history retrieved successfully",
             "status": "success",
         }, status=status.HTTP_200_OK)
 
+    except InvalidCursor as E:
+        return invalid_cursor_response(E)
     except Exception as E:
         return Response({
             "errors": str(E),
             "message": f"An error occurred: {E}",
             "status": "error",
-        }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_chat_prompt_cache_metrics(request):
+    """
+    GET view with hit/miss counters of the per-book Gemini chat prompt cache
+    URL: /chat-prompt-cache-metrics/
+    """
+    try:
+        return Response({
+            "data": get_prompt_cache_metrics(),
+            "errors": "",
+            "message": "Chat prompt cache metrics retrieved successfully",
+            "status": "success",
+        }, status=status.HTTP_200_OK)
+
+    except Exception as E:
+        return Response({
+            "errors": str(E),
+            "message": f"An error occurred: {E}",
+            "status": "error",
+        }, status=status.HTTP_400_BAD_REQUEST)
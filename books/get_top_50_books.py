@@ -1,4 +1,14 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
 from .utils import search_books
+from .models import BookListSnapshot
+
+logger = logging.getLogger(__name__)
+
+TOP_50_SNAPSHOT = "top_50"
+# Bounded so a refresh can't exhaust the Google Books connection pool or quota
+MAX_WORKERS = 8
 top_50 = [
   "intitle:The+7+Habits+of+Highly+Effective+People+inauthor:Stephen+Covey",
   "intitle:Atomic+Habits+inauthor:James+Clear",
@@ -50,11 +60,44 @@ top_50 = [
   "intitle:Make+Time+inauthor:Jake+Knapp"
 ]
 
+def _search_top_book(book):
+    try:
+        return search_books(book, 1)
+    finally:
+        # search_books touches the cache table; don't leak this worker thread's DB connection
+        connections.close_all()
+
+
 def get_top_50():
-    result = []
-    for book in top_50:
-        get_book = search_books(book, 1)
-        result.append(get_book)
-    
-    return result
+    """Fetch every top_50 query concurrently, keeping the list order."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        return list(pool.map(_search_top_book, top_50))
+
+
+def save_top_50_snapshot(result):
+    """Store a fetched top 50 list, unless upstream was mostly failing. Returns True if stored."""
+    fetched = sum(1 for book in result if book)
+    if fetched < len(top_50) // 2:
+        # Upstream is mostly failing; keep serving the previous snapshot
+        logger.warning(f"Top 50 refresh only fetched {fetched}/{len(top_50)} books, keeping previous snapshot")
+        return False
+
+    BookListSnapshot.objects.update_or_create(name=TOP_50_SNAPSHOT, defaults={"data": result})
+    logger.info(f"✓ Refreshed top 50 snapshot ({fetched}/{len(top_50)} books)")
+    return True
+
+
+def refresh_top_50_snapshot():
+    """Rebuild the stored top 50 snapshot. Run periodically by the scheduler."""
+    result = get_top_50()
+    return result if save_top_50_snapshot(result) else None
+
 
+def get_top_50_snapshot():
+    """Serve the stored snapshot; only the very first call (empty table) goes upstream."""
+    snapshot = BookListSnapshot.objects.filter(name=TOP_50_SNAPSHOT).values_list("data", flat=True).first()
+    if snapshot is None:
+        # Fetch once and serve that result even if it was too patchy to store
+        snapshot = get_top_50()
+        save_top_50_snapshot(snapshot)
+    return snapshot
@@ -0,0 +1,88 @@
+"""
+Read-through cache for Google Books lookups, stored in the shared "persistent" cache.
+
+- Keys are built from the normalized query / category, or the exact volume id.
+- Entries stay fresh for their TTL, then are served stale for STALE_TTL while one
+  background refresh revalidates them (stale-while-revalidate).
+- Misses (unknown volume ids, searches with no items) are cached for NEGATIVE_TTL so
+  repeated bad lookups don't go upstream either.
+- Upstream errors are never cached; the fetch function raises and the caller handles it.
+"""
+import hashlib
+import logging
+import threading
+import time
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TTL = 60 * 60 * 6  # 6 hours
+CATEGORY_TTL = 60 * 60 * 12  # 12 hours
+VOLUME_TTL = 60 * 60 * 24  # 1 day
+STALE_TTL = 60 * 60 * 24  # serve stale entries for up to a day while revalidating
+NEGATIVE_TTL = 60 * 10  # 10 minutes
+REFRESH_LOCK_TTL = 60
+
+
+def get_cache():
+    return caches["persistent"]
+
+
+def normalize_part(value):
+    return " ".join(str(value).lower().split())
+
+
+def build_cache_key(kind, parts, normalize=True):
+    normalized = "|".join(normalize_part(part) if normalize else str(part) for part in parts)
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    return f"google_books:{kind}:{digest}"
+
+
+def is_empty_result(value):
+    return not value or not value.get("items")
+
+
+def cached_lookup(kind, parts, fetch, ttl, is_miss=is_empty_result, normalize=True):
+    """
+    Return the cached value for (kind, parts), calling fetch() only when there is no entry.
+    Stale entries are returned immediately and refreshed in the background.
+    Pass normalize=False for case-sensitive parts such as volume ids.
+    """
+    key = build_cache_key(kind, parts, normalize)
+    entry = get_cache().get(key)
+    if entry is not None:
+        if entry["fresh_until"] <= time.time():
+            _revalidate_in_background(key, fetch, ttl, is_miss)
+        return entry["value"]
+
+    return _fetch_and_store(key, fetch, ttl, is_miss)
+
+
+def _fetch_and_store(key, fetch, ttl, is_miss):
+    value = fetch()
+    if is_miss(value):
+        # Negative entries expire outright; no point serving a stale miss
+        fresh_for, timeout = NEGATIVE_TTL, NEGATIVE_TTL
+    else:
+        fresh_for, timeout = ttl, ttl + STALE_TTL
+    get_cache().set(key, {"value": value, "fresh_until": time.time() + fresh_for}, timeout=timeout)
+    return value
+
+
+def _revalidate_in_background(key, fetch, ttl, is_miss):
+    lock_key = f"{key}:refreshing"
+    # cache.add only succeeds for one caller, so a stale key is refreshed once across workers
+    if not get_cache().add(lock_key, 1, timeout=REFRESH_LOCK_TTL):
+        return
+
+    def revalidate():
+        try:
+            _fetch_and_store(key, fetch, ttl, is_miss)
+        except Exception as e:
+            logger.warning(f"Google Books revalidation failed for {key}: {e}")
+        finally:
+            get_cache().delete(lock_key)
+            connections.close_all()
+
+    threading.Thread(target=revalidate, daemon=True).start()
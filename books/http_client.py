@@ -0,0 +1,124 @@
+"""
+Shared outbound HTTP client.
+
+One pooled keep-alive requests.Session per client (urllib3 keeps a connection pool per host),
+connect/read timeouts on every call, bounded retries with jittered exponential backoff on
+429/5xx (Retry-After honoured up to MAX_RETRY_AFTER seconds), and a per-host circuit breaker
+so a failing upstream is skipped quickly instead of tying up gunicorn workers.
+"""
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Longest Retry-After we wait out inside a request; a worker can't sleep for minutes
+MAX_RETRY_AFTER = 5
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without touching the network while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures for a host, rejects calls for
+    `reset_timeout` seconds, then lets a trial call through (half-open). A success closes it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at >= self.reset_timeout:
+                # Half-open: let this call through; another failure re-opens the circuit
+                self._opened_at[host] = time.monotonic()
+                return True
+            return False
+
+    def record_success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, host):
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.failure_threshold:
+                if host not in self._opened_at:
+                    logger.warning(f"Circuit opened for {host} after {failures} consecutive failures")
+                self._opened_at[host] = time.monotonic()
+
+
+class BoundedRetry(Retry):
+    """Retry that honours Retry-After only up to MAX_RETRY_AFTER seconds."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+class HttpClient:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=3, backoff_factor=0.5, backoff_jitter=0.5,
+                 pool_connections=10, pool_maxsize=20, breaker=None):
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+
+        retry = BoundedRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            # Hand the last response back so callers can raise_for_status() as before
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, **kwargs):
+        host = urlsplit(url).netloc
+        if not self.breaker.allow(host):
+            raise CircuitOpenError(f"Circuit open for {host}, skipping request")
+
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure(host)
+            raise
+
+        if response.status_code in RETRY_STATUSES:
+            self.breaker.record_failure(host)
+        else:
+            self.breaker.record_success(host)
+        return response
+
+
+# Used for every call to googleapis.com/books
+GOOGLE_BOOKS_CLIENT = HttpClient()
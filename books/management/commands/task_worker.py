@@ -0,0 +1,98 @@
+# books/management/commands/task_worker.py
+"""
+Runs queued BackgroundTasks (see books/task_queue.py).
+Usage: python manage.py task_worker --concurrency 4
+
+Each of the --concurrency threads claims one task at a time. The main thread renews the
+leases of running tasks and, on SIGTERM/Ctrl+C, lets the running tasks finish before exiting.
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from books.task_queue import claim_task, renew_leases, run_task
+
+logger = logging.getLogger(__name__)
+
+LEASE_RENEW_INTERVAL = 30
+
+
+class Command(BaseCommand):
+    help = "Runs the background task queue worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="Tasks run in parallel (threads)")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when no task is due")
+        parser.add_argument("--once", action="store_true", help="Exit once no task is due instead of polling")
+
+    def handle(self, *args, **options):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = options["poll_interval"]
+        self.once = options["once"]
+        self.stopping = threading.Event()
+        self.active = set()
+        self.active_lock = threading.Lock()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stopping.set())
+
+        threads = [
+            threading.Thread(target=self.work, name=f"task-worker-{i}", daemon=True)
+            for i in range(max(1, options["concurrency"]))
+        ]
+        logger.info(f"Task worker {self.worker_id} starting {len(threads)} threads")
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=LEASE_RENEW_INTERVAL / len(threads))
+                with self.active_lock:
+                    active = list(self.active)
+                if active:
+                    renew_leases(active, self.worker_id)
+        except KeyboardInterrupt:
+            logger.info("Stopping task worker, waiting for running tasks...")
+            self.stopping.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection.close()
+        logger.info(f"Task worker {self.worker_id} stopped")
+
+    def work(self):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    background_task = claim_task(self.worker_id)
+                except Exception as e:
+                    # e.g. the database went away; keep the thread alive and try again
+                    logger.error(f"Task worker failed to claim a task: {e}")
+                    self.stopping.wait(self.poll_interval)
+                    continue
+
+                if background_task is None:
+                    if self.once:
+                        return
+                    self.stopping.wait(self.poll_interval)
+                    continue
+
+                with self.active_lock:
+                    self.active.add(background_task.pk)
+                try:
+                    run_task(background_task, self.worker_id)
+                except Exception as e:
+                    logger.error(f"Task worker failed to record task {background_task.pk}: {e}")
+                finally:
+                    with self.active_lock:
+                        self.active.discard(background_task.pk)
+        finally:
+            connection.close()
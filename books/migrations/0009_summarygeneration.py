@@ -0,0 +1,27 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0008_chathistory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummaryGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_id', models.CharField(max_length=255, unique=True)),
+                ('book_title', models.CharField(max_length=255)),
+                ('book_author', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('failed', 'failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=1)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_summarygeneration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookanalysisresponse',
+            name='document',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
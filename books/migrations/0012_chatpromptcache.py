@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0011_booklistsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatPromptCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_id', models.CharField(max_length=255)),
+                ('prompt_version', models.CharField(max_length=40)),
+                ('context_hash', models.CharField(max_length=40)),
+                ('cache_name', models.CharField(max_length=255)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('miss_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='chatpromptcache',
+            constraint=models.UniqueConstraint(fields=('book_id', 'prompt_version'), name='unique_chat_prompt_cache'),
+        ),
+    ]
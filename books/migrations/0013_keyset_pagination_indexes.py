@@ -0,0 +1,51 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:28
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_note_created_at(apps, schema_editor):
+    # Notes saved before created_at was filled in sort as the oldest ones
+    Notes = apps.get_model('books', 'Notes')
+    oldest = Notes.objects.exclude(created_at=None).order_by('created_at').values_list('created_at', flat=True).first()
+    Notes.objects.filter(created_at=None).update(created_at=oldest or django.utils.timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0012_chatpromptcache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookmarkbook',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='userextractedbooks',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_note_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notes',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddIndex(
+            model_name='bookmarkbook',
+            index=models.Index(fields=['user', '-created_at'], name='books_bookm_user_id_c820c7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notes',
+            index=models.Index(fields=['user', '-created_at'], name='books_notes_user_id_88f456_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userextractedbooks',
+            index=models.Index(fields=['user', '-created_at'], name='books_usere_user_id_bf3aab_idx'),
+        ),
+    ]
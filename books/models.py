@@ -1,4 +1,6 @@
+from datetime import timedelta
 from django.db import models
+from django.utils import timezone
 from account.utils import generate_id
 from account.models import User
 
@@ -71,6 +73,26 @@ class OnePageSummary(models.Model):
     bottom_line = models.TextField()
 
 
+class BookAnalysisResponseQuerySet(models.QuerySet):
+    def with_summary_relations(self):
+        """
+        Load everything BookAnalysisResponseSerializer walks in a constant number of queries:
+        one joined SELECT for the one-to-one parts plus one prefetch each for
+        framework components, guide steps (ordered by step_number) and key insights.
+        """
+        return self.select_related(
+            "main_argument",
+            "framework",
+            "implementation_guide",
+            "implementation_guide__meta",
+            "one_page_summary",
+        ).prefetch_related(
+            models.Prefetch("framework__components", queryset=FrameworkComponent.objects.order_by("id")),
+            models.Prefetch("implementation_guide__steps", queryset=ImplementationStep.objects.order_by("step_number", "id")),
+            models.Prefetch("key_insights", queryset=KeyInsight.objects.order_by("id")),
+        )
+
+
 class BookAnalysisResponse(models.Model):
     """Top-level model for saving the full analysis."""
     book_id = models.CharField(max_length=255, unique=True)
@@ -81,13 +103,84 @@ class BookAnalysisResponse(models.Model):
     implementation_guide = models.OneToOneField(ImplementationGuide, on_delete=models.CASCADE, related_name="book_analysis")
     one_page_summary = models.OneToOneField(OnePageSummary, on_delete=models.CASCADE, related_name="book_analysis")
     key_insights = models.ManyToManyField(KeyInsight, related_name="book_analyses")
+    # Fully serialized BookAnalysisResponseSerializer output, kept in sync by books/signals.py
+    document = models.JSONField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookAnalysisResponseQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.book_title}"
 
 
+summary_generation_status = (
+    ("pending", "pending"),
+    ("failed", "failed"),
+)
+
+
+class SummaryGeneration(models.Model):
+    """
+    Single-flight marker for summary generation. At most one row exists per book_id;
+    the request that creates (or reclaims) it runs the Gemini call, everyone else attaches.
+    The row is removed once the BookAnalysisResponse has been saved.
+    """
+    # A pending generation older than this is treated as abandoned (crashed worker) and can be reclaimed
+    TIMEOUT = timedelta(minutes=10)
+
+    book_id = models.CharField(max_length=255, unique=True)
+    book_title = models.CharField(max_length=255)
+    book_author = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=summary_generation_status, default="pending")
+    attempts = models.PositiveIntegerField(default=1)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def is_in_flight(self):
+        return self.status == "pending" and self.started_at > timezone.now() - self.TIMEOUT
+
+    def __str__(self):
+        return f"{self.book_title} ({self.status})"
+
+
+
+class BookListSnapshot(models.Model):
+    """Precomputed book lists (e.g. the top 50) refreshed by the scheduler and served as-is."""
+    name = models.CharField(max_length=100, unique=True)
+    data = models.JSONField(default=list)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refreshed_at})"
+
+
+
+class ChatPromptCache(models.Model):
+    """
+    Gemini cached-content handle holding the chat system prompt for one book and prompt version.
+    Chat turns about the book reference cache_name instead of resending the whole prompt.
+    """
+    book_id = models.CharField(max_length=255)
+    prompt_version = models.CharField(max_length=40)
+    # Hash of the book context the prompt was built from, a changed analysis gets a new cache
+    context_hash = models.CharField(max_length=40)
+    cache_name = models.CharField(max_length=255)
+    expires_at = models.DateTimeField(db_index=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    miss_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['book_id', 'prompt_version'], name='unique_chat_prompt_cache'),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} ({self.prompt_version})"
+
+
 
 # OTHER MODELS
 class UserExtractedBooks(models.Model):
@@ -97,6 +190,13 @@ class UserExtractedBooks(models.Model):
     book_title = models.CharField(max_length=255)
     book_img = models.CharField(max_length=500, blank=True, null=True)
     book_author = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
     def __str__(self):
         return f"{self.book_title}"
     
@@ -108,6 +208,13 @@ class BookmarkBook(models.Model):
     book_img = models.CharField(max_length=500, blank=True, null=True)
     book_title = models.CharField(max_length=255)
     book_author = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
     def __str__(self):
         return f"{self.book_title}"
     
@@ -123,7 +230,13 @@ class Notes(models.Model):
     title = models.CharField(max_length=255)
     book_author = models.CharField(max_length=255)
     note_type = models.CharField(max_length=255, blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
     def __str__(self):
         return f"{self.book_title}"
 
@@ -147,4 +260,40 @@ class ChatHistory(models.Model):
         ]
 
     def __str__(self):
-        return f"Chat for {self.book_title} by {self.user.email}"
\ No newline at end of file
+        return f"Chat for {self.book_title} by {self.user.email}"
+
+background_task_status = (
+    ("queued", "queued"),
+    ("running", "running"),
+    ("succeeded", "succeeded"),
+    ("failed", "failed"),
+)
+
+
+class BackgroundTask(models.Model):
+    """
+    One call of a @task function, queued by a web process and run by `manage.py task_worker`.
+    While running, run_after is the end of the worker's lease; a task whose lease ran out
+    (crashed worker) is picked up again.
+    """
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=background_task_status, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='task_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,80 @@
+"""
+Keyset (cursor) pagination for per-user lists ordered newest first.
+
+Pages are ordered by (-created_at, -id) and the cursor is an opaque token holding the
+(created_at, id) of the last row served, so every page is a bounded range scan on the
+(user, ..., -created_at) indexes instead of an OFFSET that reads and discards earlier rows.
+
+    rows, next_cursor = paginate_by_created(queryset, request)
+
+Clients pass ?cursor=<next_cursor> for the following page and ?limit= to size it (the
+REST_FRAMEWORK PAGE_SIZE by default, at most MAX_PAGE_SIZE); next_cursor is None on the
+last page. A request with neither parameter gets the first page. A cursor
+that can't be decoded, empty included, raises InvalidCursor; views answer it with
+invalid_cursor_response().
+"""
+import base64
+import json
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    raw = json.dumps([created_at.isoformat(), str(pk)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(created_at), model._meta.pk.to_python(pk)
+    except (ValueError, TypeError, ValidationError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def invalid_cursor_response(error):
+    return Response(
+        {
+            "errors": str(error),
+            "message": f"Error loading page: {str(error)}",
+            "status": status.HTTP_400_BAD_REQUEST,
+        },
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def get_page_size(request):
+    default = api_settings.PAGE_SIZE or 100
+    try:
+        page_size = int(request.query_params.get("limit", default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def paginate_by_created(queryset, request):
+    """Return (rows, next_cursor) for one page of queryset, newest first."""
+    queryset = queryset.order_by("-created_at", "-id")
+    cursor = request.query_params.get("cursor")
+    page_size = get_page_size(request)
+    if cursor is not None:
+        created_at, pk = decode_cursor(cursor, queryset.model)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    # One extra row tells us whether there is a next page without a COUNT
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].pk)
@@ -105,6 +105,11 @@ class BookAnalysisResponseSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    @staticmethod
+    def get_queryset():
+        """Queryset to serialize from; keeps the nested read at a fixed query count (no N+1)."""
+        return BookAnalysisResponse.objects.with_summary_relations()
+
 
 
 
@@ -0,0 +1,100 @@
+"""
+Keep BookAnalysisResponse.document in sync when any part of an analysis is edited
+(admin, shell, future endpoints). Refreshes run on commit so the document always
+reflects committed rows.
+"""
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from .models import (
+    MainArgument,
+    Framework,
+    FrameworkComponent,
+    KeyInsight,
+    ImplementationGuide,
+    ImplementationStep,
+    ImplementationMeta,
+    OnePageSummary,
+    BookAnalysisResponse,
+)
+
+
+def _schedule_refresh(book_analysis_ids):
+    book_analysis_ids = list(book_analysis_ids)
+    if book_analysis_ids:
+        from .analysis_document import refresh_analysis_documents
+        transaction.on_commit(partial(refresh_analysis_documents, book_analysis_ids))
+
+
+def _analysis_ids(**lookup):
+    return BookAnalysisResponse.objects.filter(**lookup).values_list("id", flat=True)
+
+
+@receiver(post_save, sender=BookAnalysisResponse)
+def analysis_saved(sender, instance, created, **kwargs):
+    # New analyses are materialized by save_book_analysis once their children exist
+    if not created:
+        _schedule_refresh([instance.pk])
+
+
+@receiver(post_save, sender=MainArgument)
+def main_argument_saved(sender, instance, created, **kwargs):
+    if not created:
+        _schedule_refresh(_analysis_ids(main_argument=instance))
+
+
+@receiver(post_save, sender=Framework)
+def framework_saved(sender, instance, created, **kwargs):
+    if not created:
+        _schedule_refresh(_analysis_ids(framework=instance))
+
+
+@receiver(post_save, sender=FrameworkComponent)
+@receiver(post_delete, sender=FrameworkComponent)
+def framework_component_changed(sender, instance, **kwargs):
+    _schedule_refresh(_analysis_ids(framework_id=instance.framework_id))
+
+
+@receiver(post_save, sender=KeyInsight)
+def key_insight_saved(sender, instance, created, **kwargs):
+    if not created:
+        _schedule_refresh(_analysis_ids(key_insights=instance))
+
+
+@receiver(pre_delete, sender=KeyInsight)
+def key_insight_deleted(sender, instance, **kwargs):
+    # The M2M links are gone after the delete, so collect the analyses first
+    _schedule_refresh(_analysis_ids(key_insights=instance))
+
+
+@receiver(m2m_changed, sender=BookAnalysisResponse.key_insights.through)
+def key_insights_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # insight.book_analyses.clear(): pk_set isn't provided, so collect the analyses first
+        _schedule_refresh(_analysis_ids(key_insights=instance))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if not reverse:
+            _schedule_refresh([instance.pk])
+        elif pk_set:
+            _schedule_refresh(pk_set)
+
+
+@receiver(post_save, sender=ImplementationGuide)
+def implementation_guide_saved(sender, instance, created, **kwargs):
+    if not created:
+        _schedule_refresh(_analysis_ids(implementation_guide=instance))
+
+
+@receiver(post_save, sender=ImplementationStep)
+@receiver(post_delete, sender=ImplementationStep)
+@receiver(post_save, sender=ImplementationMeta)
+@receiver(post_delete, sender=ImplementationMeta)
+def implementation_detail_changed(sender, instance, **kwargs):
+    _schedule_refresh(_analysis_ids(implementation_guide_id=instance.guide_id))
+
+
+@receiver(post_save, sender=OnePageSummary)
+def one_page_summary_saved(sender, instance, created, **kwargs):
+    if not created:
+        _schedule_refresh(_analysis_ids(one_page_summary=instance))
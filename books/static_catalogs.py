@@ -0,0 +1,71 @@
+"""
+Process-level cache for the JSON catalogs in static/ (categories, popular books,
+notification times, pricing).
+
+Each catalog is parsed (and post-processed) once per process and kept in memory together
+with its pre-encoded response body, ETag and Last-Modified. The file is only re-read when
+its mtime/size changes, so editing a catalog on disk still takes effect without a restart.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+
+def success_envelope(data):
+    return {"data": data, "message": "success", "status": 200}
+
+
+class StaticCatalog:
+    def __init__(self, filename, transform=None, envelope=success_envelope):
+        self.path = os.path.join(STATIC_DIR, filename)
+        self.transform = transform
+        self.envelope = envelope
+        self._lock = threading.Lock()
+        # (signature, data, body, etag, last_modified) swapped in as one tuple so readers never see a half update
+        self._state = None
+
+    def _current_state(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        state = self._state
+        if state is not None and state[0] == signature:
+            return state
+
+        with self._lock:
+            state = self._state
+            if state is not None and state[0] == signature:
+                return state
+
+            with open(self.path, 'r') as catalog_file:
+                data = json.load(catalog_file)
+            if self.transform:
+                data = self.transform(data)
+
+            body = json.dumps(self.envelope(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            state = (signature, data, body, etag, int(stat.st_mtime))
+            self._state = state
+            return state
+
+    def get(self):
+        """Return the parsed (and transformed) catalog data."""
+        return self._current_state()[1]
+
+    def response(self, request):
+        """Serve the pre-encoded body, answering 304 when the client's copy is current."""
+        _, _, body, etag, last_modified = self._current_state()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(body, content_type="application/json")
+        # A 304 must repeat the validators so caches can keep revalidating
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,161 @@
+"""
+Durable background task queue on the BackgroundTask table.
+
+Web processes only enqueue: a @task function's .enqueue(*args) inserts a row (inside the
+caller's transaction, if any). `python manage.py task_worker` runs them:
+
+- claim_task() takes the most urgent due row (highest priority, then oldest run_after) with
+  SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker threads and processes can
+  poll the same table without ever running a task twice at the same time
+- a claimed task is leased for its visibility timeout; the worker renews the lease while
+  the task runs, and a task whose lease lapsed (crashed worker) becomes due again
+- a task that raises is retried with exponential backoff until max_attempts, then left
+  as failed with its error. Return values are ignored, so a task that records its own
+  failure (on a job row, say) must still re-raise for the queue to retry it; it can ask
+  is_final_attempt() whether this failure is the last one
+
+Arguments must be JSON serializable.
+"""
+import contextvars
+import importlib
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VISIBILITY_TIMEOUT = timedelta(minutes=10)
+# Retry n waits RETRY_BASE * 2 ** (n - 1)
+RETRY_BASE = timedelta(seconds=30)
+KEEP_FINISHED_FOR = timedelta(days=7)
+
+# name -> function, filled by @task as the modules defining tasks are imported
+TASKS = {}
+# The BackgroundTask being run by run_task in this thread
+current_task = contextvars.ContextVar("current_task", default=None)
+
+
+def task_name(func):
+    return f"{func.__module__}.{func.__name__}"
+
+
+def task(func=None, *, priority=0, max_attempts=3, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+    """Register a function as a background task and give it .enqueue(*args, **kwargs)."""
+    def decorator(func):
+        name = task_name(func)
+        func.task_options = {
+            "priority": priority,
+            "max_attempts": max_attempts,
+            "visibility_timeout": visibility_timeout,
+        }
+        func.enqueue = lambda *args, **kwargs: enqueue(func, *args, **kwargs)
+        TASKS[name] = func
+        return func
+    return decorator(func) if func is not None else decorator
+
+
+def enqueue(func, *args, priority=None, delay=None, **kwargs):
+    options = func.task_options
+    return BackgroundTask.objects.create(
+        name=task_name(func),
+        args=list(args),
+        kwargs=kwargs,
+        priority=options["priority"] if priority is None else priority,
+        max_attempts=options["max_attempts"],
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def resolve(name):
+    """The registered function for a task name, importing its module if needed."""
+    if name not in TASKS:
+        importlib.import_module(name.rsplit(".", 1)[0])
+    return TASKS[name]
+
+
+def visibility_timeout(name):
+    try:
+        return resolve(name).task_options["visibility_timeout"]
+    except (ImportError, KeyError):
+        return DEFAULT_VISIBILITY_TIMEOUT
+
+
+def claim_task(worker_id):
+    """Lease the most urgent due task to this worker, or return None if nothing is due."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = (
+            BackgroundTask.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="queued") | Q(status="running", attempts__lt=F("max_attempts")), run_after__lte=now)
+            .order_by("-priority", "run_after", "id")
+            .first()
+        )
+        if claimed is None:
+            return None
+        BackgroundTask.objects.filter(pk=claimed.pk).update(
+            status="running",
+            attempts=F("attempts") + 1,
+            locked_by=worker_id,
+            run_after=now + visibility_timeout(claimed.name),
+            started_at=now,
+        )
+    claimed.refresh_from_db()
+    return claimed
+
+
+def is_final_attempt():
+    """Whether a failure of the running task won't be retried. True outside run_task (a direct call)."""
+    background_task = current_task.get()
+    return background_task is None or background_task.attempts >= background_task.max_attempts
+
+
+def renew_leases(task_ids, worker_id):
+    """Push out the lease of tasks this worker is still running."""
+    for background_task in BackgroundTask.objects.filter(pk__in=task_ids, locked_by=worker_id, status="running"):
+        BackgroundTask.objects.filter(pk=background_task.pk, locked_by=worker_id).update(
+            run_after=timezone.now() + visibility_timeout(background_task.name)
+        )
+
+
+def run_task(background_task, worker_id):
+    """Run a claimed task and record the outcome. Returns True if it succeeded."""
+    owned = BackgroundTask.objects.filter(pk=background_task.pk, locked_by=worker_id, status="running")
+    token = current_task.set(background_task)
+    try:
+        func = resolve(background_task.name)
+        func(*background_task.args, **background_task.kwargs)
+    except Exception as e:
+        logger.error(f"Task {background_task.name} ({background_task.pk}) failed, attempt {background_task.attempts}: {e}")
+        if background_task.attempts >= background_task.max_attempts:
+            owned.update(status="failed", last_error=str(e), locked_by=None, finished_at=timezone.now())
+        else:
+            owned.update(
+                status="queued",
+                last_error=str(e),
+                locked_by=None,
+                run_after=timezone.now() + RETRY_BASE * 2 ** (background_task.attempts - 1),
+            )
+        return False
+    finally:
+        current_task.reset(token)
+
+    owned.update(status="succeeded", locked_by=None, finished_at=timezone.now())
+    return True
+
+
+def prune_tasks():
+    """
+    Fail tasks whose lease lapsed on their last attempt, and delete tasks that succeeded
+    more than KEEP_FINISHED_FOR ago. Failed tasks are kept.
+    """
+    now = timezone.now()
+    BackgroundTask.objects.filter(status="running", run_after__lte=now, attempts__gte=F("max_attempts")).update(
+        status="failed", last_error="Worker lease expired on the last attempt", locked_by=None, finished_at=now
+    )
+    deleted, _ = BackgroundTask.objects.filter(
+        status="succeeded", finished_at__lt=now - KEEP_FINISHED_FOR
+    ).delete()
+    return deleted
@@ -1,39 +1,87 @@
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 from .save_summary import save_book_analysis
-from apscheduler.triggers.date import DateTrigger
 from .gemini import generate_summary_keypoints, generate_book_search
 import json
-from account.models import User, UserSubscriptionUsage
+import logging
+from account.models import User
+from account.bulk_jobs import FREE_TRIAL_DAYS, FREE_TRIAL_PLAN, run_free_trial_grant, set_usage_limits
+from account.subscription_utils import allowedUsage
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils import timezone
+from .models import BookAnalysisResponse, SummaryGeneration
+from .task_queue import is_final_attempt, task
 from account.emailFunc import send_verification_email, send_free_trial_email
 from account.helpers import send_notiifcation
 
+logger = logging.getLogger(__name__)
 
-def get_scheduler():
+@task(priority=10)
+def summarize_and_save(book_title, book_author, book_id):
     """
-    Lazy-load the scheduler to avoid import-time initialization issues.
-    This ensures the scheduler is only accessed when needed, not at module import.
+    Generate and store the summary. Failures re-raise so the task queue retries (see
+    task_queue.run_task); the SummaryGeneration stays pending while a retry is coming and
+    is marked failed only when the last attempt fails.
     """
-    from .scheduler import scheduler
-    return scheduler
+    if BookAnalysisResponse.objects.filter(book_id=book_id).exists():
+        # A retry or a reclaimed generation already stored it
+        SummaryGeneration.objects.filter(book_id=book_id).delete()
+        return True
 
-def summarize_and_save(book_title, book_author, book_id):
-    summary = generate_summary_keypoints(book_title, book_author)
-    parseResponse = json.loads(summary)
-    save_book_analysis(parseResponse, book_title, book_author, book_id)
+    SummaryGeneration.objects.filter(book_id=book_id).update(status="pending", started_at=timezone.now())
+    try:
+        summary = generate_summary_keypoints(book_title, book_author)
+        parseResponse = json.loads(summary)
+        book_analysis = save_book_analysis(parseResponse, book_title, book_author, book_id)
+        if book_analysis is None:
+            raise RuntimeError(f"Could not save the summary of {book_id}")
+    except Exception as E:
+        logger.error(f"Summary generation failed for {book_id}: {E}")
+        if is_final_attempt():
+            # Leave a failed marker so the next summarize request can reclaim the generation
+            SummaryGeneration.objects.filter(book_id=book_id).update(status="failed")
+        else:
+            # Still in flight: keep it fresh through the retry backoff so it isn't reclaimed
+            SummaryGeneration.objects.filter(book_id=book_id).update(started_at=timezone.now())
+        raise
+
+    SummaryGeneration.objects.filter(book_id=book_id).delete()
     return True
 
+
+def claim_summary_generation(book_title, book_author, book_id):
+    """
+    Try to become the single in-flight generation for book_id.
+    Returns True if the caller owns the generation and should run it,
+    False if another request already has one in flight (the caller just attaches to it).
+    """
+    try:
+        with transaction.atomic():
+            SummaryGeneration.objects.create(book_id=book_id, book_title=book_title, book_author=book_author)
+        return True
+    except IntegrityError:
+        pass
+
+    # Row already exists: only reclaim it if the previous attempt failed or was abandoned.
+    # The conditional UPDATE is atomic, so concurrent reclaimers can't both win.
+    now = timezone.now()
+    reclaimed = SummaryGeneration.objects.filter(book_id=book_id).filter(
+        Q(status="failed") | Q(started_at__lte=now - SummaryGeneration.TIMEOUT)
+    ).update(status="pending", started_at=now, attempts=F("attempts") + 1)
+    return reclaimed == 1
+
+
 def SCHEDULE_BOOK_SUMMARY(book_title, book_author, book_id):
-    run_at = datetime.now() + timedelta(seconds=2)
-    scheduler = get_scheduler()
-    scheduler.add_job(
-        summarize_and_save,
-        trigger=DateTrigger(run_date=run_at),
-        args=[book_title, book_author, book_id],
-        id=f"book_summary_{int(run_at.timestamp())}",  # unique ID
-        replace_existing=False
-    )
+    if not claim_summary_generation(book_title, book_author, book_id):
+        return False
+
+    try:
+        summarize_and_save.enqueue(book_title, book_author, book_id)
+    except Exception:
+        SummaryGeneration.objects.filter(book_id=book_id).update(status="failed")
+        raise
+    return True
     
 
 
@@ -54,82 +102,24 @@ def handle_search_book(book_title, book_author=None):
 
 
 
+@task(visibility_timeout=timedelta(minutes=30))
 def handle_give_free_trial():
-    get_users = User.objects.filter(subscription="free")
+    # Chunked and resumable, see account.bulk_jobs; a retry picks up after the last committed chunk
+    job = run_free_trial_grant()
+    if job is not None and job.status == "failed":
+        raise RuntimeError(f"Free trial job {job.pk} stopped after user {job.last_user_id or '-'}: {job.error}")
+    return job
 
-    for user in get_users:
-        user.subscription = "basic"
-        user.free_trail_end_date = timezone.now().date() + timezone.timedelta(days=30)
-        user.save()
-        send_free_trial_email(user.email)
 
-        # Create or update UserSubscriptionUsage for the user
-        usage, created = UserSubscriptionUsage.objects.get_or_create(
-            user=user,
-            defaults={
-                'summaries': 10,
-                'notes': 25,
-                'reminders': 10,
-                'smart_search': 10,
-            }
-        )
-
-        # If usage already exists, update the values
-        if not created:
-            usage.summaries = 10
-            usage.notes = 25
-            usage.reminders = 10
-            usage.smart_search = 10
-            usage.save()
-
-        try:
-            pass
-            # send_notiifcation(
-            #     user.notification_token,
-            #     "Congratulations - 30 Days free trial",
-            #     "Congratulations - 30 Days free trial",
-            #     "",
-            # )
-        except:
-            pass
-        
 def single_free_trial(user: User):
     if user.subscription == "free":
-        user.subscription = "basic"
-        user.free_trail_end_date = timezone.now().date() + timezone.timedelta(days=30)
+        user.subscription = FREE_TRIAL_PLAN
+        user.free_trail_end_date = timezone.now().date() + timezone.timedelta(days=FREE_TRIAL_DAYS)
         user.save()
         send_free_trial_email(user.email)
-
-        # Create or update UserSubscriptionUsage for the user
-        usage, created = UserSubscriptionUsage.objects.get_or_create(
-            user=user,
-            defaults={
-                'summaries': 10,
-                'notes': 25,
-                'reminders': 10,
-                'smart_search': 10,
-            }
-        )
-
-        # If usage already exists, update the values
-        if not created:
-            usage.summaries = 10
-            usage.notes = 25
-            usage.reminders = 10
-            usage.smart_search = 10
-            usage.save()
-
+        set_usage_limits([user.pk], allowedUsage(FREE_TRIAL_PLAN))
         return True
-        
+
 
 def SCHEDULE_FREE_TIER():
-    run_at = datetime.now() + timedelta(seconds=5)
-    scheduler = get_scheduler()
-    scheduler.add_job(
-        handle_give_free_trial,
-        trigger=DateTrigger(run_date=run_at),
-        args=[],
-        id=f"give_trial_{int(run_at.timestamp())}",
-        replace_existing=False
-    )
-     
\ No newline at end of file
+    return handle_give_free_trial.enqueue()
@@ -1,3 +1,185 @@
+from django.contrib.auth import get_user_model
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from .analysis_document import get_analysis_document
+from .models import BackgroundTask, BookAnalysisResponse, ChatHistory, Notes, SummaryGeneration
+from .save_summary import save_book_analysis
+from .serializers import BookAnalysisResponseSerializer
+from .summary_response_example import test_response
+from .task_queue import claim_task, run_task, task
+from .tasks import claim_summary_generation, summarize_and_save
+
+
+# One joined SELECT for the one-to-one parts + prefetches for components, steps and key insights
+SUMMARY_READ_QUERIES = 4
+
+
+class BookAnalysisQueryCountTests(TestCase):
+    """Regression guard so N+1 queries can't creep back into the nested summary read."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            save_book_analysis(test_response, f"Book {i}", "Author", f"book_{i}")
+
+    def test_single_summary_read_is_constant(self):
+        with self.assertNumQueries(SUMMARY_READ_QUERIES):
+            book_analysis = BookAnalysisResponseSerializer.get_queryset().get(book_id="book_0")
+            data = BookAnalysisResponseSerializer(book_analysis).data
+
+        self.assertEqual(len(data["key_insights"]), len(test_response["key_insights"]))
+        self.assertEqual(len(data["framework"]["components"]), len(test_response["framework"]["components"]))
+
+    def test_multi_summary_read_does_not_grow_with_books(self):
+        with self.assertNumQueries(SUMMARY_READ_QUERIES):
+            data = BookAnalysisResponseSerializer(BookAnalysisResponseSerializer.get_queryset(), many=True).data
+
+        self.assertEqual(len(data), 3)
+
+    def test_steps_are_ordered_by_step_number(self):
+        book_analysis = BookAnalysisResponseSerializer.get_queryset().get(book_id="book_0")
+        steps = BookAnalysisResponseSerializer(book_analysis).data["implementation_guide"]["steps"]
+        step_numbers = [step["step_number"] for step in steps]
+        self.assertEqual(step_numbers, sorted(step_numbers))
+
+    def test_materialized_document_read_is_one_query(self):
+        with self.assertNumQueries(1):
+            document = get_analysis_document("book_1")
+
+        self.assertEqual(document["book_title"], "Book 1")
+
+    def test_missing_document_is_materialized_on_read(self):
+        BookAnalysisResponse.objects.filter(book_id="book_2").update(document=None)
+
+        document = get_analysis_document("book_2")
+
+        self.assertEqual(len(document["key_insights"]), len(test_response["key_insights"]))
+        self.assertIsNotNone(BookAnalysisResponse.objects.get(book_id="book_2").document)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages must cover every row exactly once, including rows sharing a created_at."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="reader@bookflow.test", password="password")
+        for i in range(5):
+            Notes.objects.create(user=cls.user, book_id="book", book_title="Book", book_author="Author", title=f"Note {i}")
+            ChatHistory.objects.create(
+                user=cls.user, book_id="book", book_title="Book", book_author="Author",
+                user_message=f"Question {i}", ai_response="Answer",
+            )
+        # Force ties so the id tie-breaker is exercised
+        Notes.objects.update(created_at=timezone.now())
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def collect_pages(self, url):
+        ids, cursor, pages = [], None, 0
+        while True:
+            response = self.client.get(url, {"limit": 2, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["data"]]
+            pages += 1
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                return ids, pages
+
+    def test_notes_pages_cover_every_row_once(self):
+        ids, pages = self.collect_pages("/books/get_notes/")
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(ids), sorted(Notes.objects.values_list("id", flat=True)))
+
+    def test_chat_history_pages_are_newest_first(self):
+        ids, _ = self.collect_pages("/books/chat-history/book/")
+        expected = list(ChatHistory.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        for url in ("/books/get_notes/", "/books/chat-history/book/"):
+            for cursor in ("not-a-cursor", ""):
+                response = self.client.get(url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data["errors"], "Invalid cursor")
+
+    def test_requests_without_paging_parameters_get_the_default_page_size(self):
+        with mock.patch.object(api_settings, "PAGE_SIZE", 3):
+            response = self.client.get("/books/get_notes/")
+        self.assertEqual(len(response.data["data"]), 3)
+        self.assertIsNotNone(response.data["next_cursor"])
+
+
+CALLS = []
+
+
+@task(max_attempts=2)
+def record_call(value):
+    CALLS.append(value)
+
+
+@task(max_attempts=2)
+def always_fails():
+    raise RuntimeError("boom")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_tasks_run_by_priority_then_age(self):
+        record_call.enqueue("low", priority=-1)
+        record_call.enqueue("first")
+        record_call.enqueue("second")
+        record_call.enqueue("urgent", priority=5)
+
+        while (claimed := claim_task("worker")) is not None:
+            self.assertTrue(run_task(claimed, "worker"))
+
+        self.assertEqual(CALLS, ["urgent", "first", "second", "low"])
+        self.assertEqual(set(BackgroundTask.objects.values_list("status", flat=True)), {"succeeded"})
+
+    def test_claimed_task_is_leased(self):
+        record_call.enqueue("once")
+
+        self.assertIsNotNone(claim_task("worker-a"))
+        self.assertIsNone(claim_task("worker-b"))
+
+    def test_failures_retry_then_fail(self):
+        background_task = always_fails.enqueue()
+
+        self.assertFalse(run_task(claim_task("worker"), "worker"))
+        background_task.refresh_from_db()
+        self.assertEqual(background_task.status, "queued")
+        self.assertIsNone(claim_task("worker"))  # backing off
+
+        BackgroundTask.objects.filter(pk=background_task.pk).update(run_after=background_task.run_after - timedelta(hours=1))
+        self.assertFalse(run_task(claim_task("worker"), "worker"))
+        background_task.refresh_from_db()
+        self.assertEqual(background_task.status, "failed")
+        self.assertEqual(background_task.last_error, "boom")
+
+    @mock.patch("books.tasks.generate_summary_keypoints", side_effect=RuntimeError("Gemini unavailable"))
+    def test_failed_summary_is_retried_then_failed(self, _generate):
+        SummaryGeneration.objects.create(book_id="book", book_title="Book", book_author="Author")
+        background_task = summarize_and_save.enqueue("Book", "Author", "book")
 
-# Create your tests here.
+        for attempt in range(1, background_task.max_attempts + 1):
+            BackgroundTask.objects.filter(pk=background_task.pk).update(run_after=timezone.now())
+            self.assertFalse(run_task(claim_task("worker"), "worker"))
+            background_task.refresh_from_db()
+            self.assertEqual(background_task.attempts, attempt)
+            self.assertEqual(background_task.last_error, "Gemini unavailable")
+            final = attempt == background_task.max_attempts
+            # Pending (202 to pollers, not reclaimable) until the queue gives up
+            self.assertEqual(SummaryGeneration.objects.get(book_id="book").status, "failed" if final else "pending")
+            self.assertEqual(background_task.status, "failed" if final else "queued")
+            if not final:
+                self.assertFalse(claim_summary_generation("Book", "Author", "book"))
@@ -53,6 +53,8 @@ urlpatterns = [
          chat_views.chat_with_book_ai, name="chat_with_book_ai"),
     path('chat-history/<str:book_id>/',
          chat_views.get_chat_history, name="get_chat_history"),
+    path('chat-prompt-cache-metrics/',
+         chat_views.get_chat_prompt_cache_metrics, name="chat_prompt_cache_metrics"),
 
 ]
 
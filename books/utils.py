@@ -2,11 +2,16 @@ import requests
 import json
 from django.conf import settings
 from rest_framework.pagination import PageNumberPagination
+from .http_client import GOOGLE_BOOKS_CLIENT
+from .google_books_cache import cached_lookup, SEARCH_TTL, CATEGORY_TTL, VOLUME_TTL
+
+
+GOOGLE_BOOKS_VOLUMES_URL = "https://www.googleapis.com/books/v1/volumes"
 
 
 def search_books_by_categroy(max_results=40, category=None):
 
-    base_url = "https://www.googleapis.com/books/v1/volumes"
+    base_url = GOOGLE_BOOKS_VOLUMES_URL
     
     # Build search query with category filter
     # search_query = query
@@ -20,11 +25,13 @@ def search_books_by_categroy(max_results=40, category=None):
     
 
     
-    try:
-        response = requests.get(base_url, params=params)
-        print("REQUEST: ", response)
+    def fetch():
+        response = GOOGLE_BOOKS_CLIENT.get(base_url, params=params)
         response.raise_for_status()
         return response.json()
+
+    try:
+        return cached_lookup("category", (category, params["maxResults"]), fetch, CATEGORY_TTL)
     except requests.exceptions.RequestException as e:
         print("ERROR: ",category)
         return {"error": str(e)}
@@ -33,6 +40,7 @@ def search_books_by_categroy(max_results=40, category=None):
 def search_books(query, max_results=15):
     """
     Search for books using the Google Books API.
+    Results are served from the persistent cache when available.
     
     Args:
         query (str): Search query (e.g., "python programming", "isbn:9780132350884")
@@ -42,7 +50,7 @@ def search_books(query, max_results=15):
     Returns:
         dict: JSON response from the API
     """
-    base_url = "https://www.googleapis.com/books/v1/volumes"
+    base_url = GOOGLE_BOOKS_VOLUMES_URL
     
     params = {
         "q": query,
@@ -51,10 +59,13 @@ def search_books(query, max_results=15):
     }
     
     
-    try:
-        response = requests.get(base_url, params=params)
+    def fetch():
+        response = GOOGLE_BOOKS_CLIENT.get(base_url, params=params)
         response.raise_for_status()
         return response.json()
+
+    try:
+        return cached_lookup("search", (query, params["maxResults"]), fetch, SEARCH_TTL)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data: {e}")
         return None
@@ -62,6 +73,7 @@ def search_books(query, max_results=15):
 def get_book_by_id(volume_id):
     """
     Get detailed information about a specific book by its volume ID.
+    Results (including unknown ids) are served from the persistent cache when available.
     
     Args:
         volume_id (str): The Google Books volume ID
@@ -70,16 +82,22 @@ def get_book_by_id(volume_id):
     Returns:
         dict: JSON response with book details
     """
-    url = f"https://www.googleapis.com/books/v1/volumes/{volume_id}"
+    url = f"{GOOGLE_BOOKS_VOLUMES_URL}/{volume_id}"
     
     params = {
         "key": settings.GOOGLE_BOOKS_API_KEY
     }
     
-    try:
-        response = requests.get(url, params=params)
+    def fetch():
+        response = GOOGLE_BOOKS_CLIENT.get(url, params=params)
+        if response.status_code == 404:
+            return None
         response.raise_for_status()
         return response.json()
+
+    try:
+        # Volume ids are case-sensitive, so they are not normalized into the key
+        return cached_lookup("volume", (volume_id,), fetch, VOLUME_TTL, is_miss=lambda book: book is None, normalize=False)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching book: {e}")
         return None
@@ -7,14 +7,24 @@ from rest_framework.permissions import AllowAny,IsAuthenticated
 from .utils import search_books, get_book_by_id, search_books_by_categroy, extract_books_items
 from django_ratelimit.decorators import ratelimit
 from .summary_response_example import test_response
-from .models import BookAnalysisResponse, UserExtractedBooks, BookmarkBook, Notes
-from .serializers import BookAnalysisResponseSerializer, BookmarkBookSerializer, UserExtractedBooksSerializer, NotesSerializer
-from account.subscription_utils import update_subscription_usage, subscription_limit_required
+from .models import BookAnalysisResponse, UserExtractedBooks, BookmarkBook, Notes, SummaryGeneration
+from .analysis_document import get_analysis_document
+from .pagination import InvalidCursor, invalid_cursor_response, paginate_by_created
+from .serializers import BookmarkBookSerializer, UserExtractedBooksSerializer, NotesSerializer
+from account.subscription_utils import subscription_limit_required
 from .tasks import SCHEDULE_BOOK_SUMMARY, handle_search_book
 from django.views.decorators.cache import cache_page
+from .static_catalogs import StaticCatalog
 import os 
 from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Parsed once per process, reloaded only when the file changes
+BOOK_CATEGORIES = StaticCatalog(
+    "categories.json",
+    envelope=lambda categories: {"data": categories, "message": "success", "status": status.HTTP_201_CREATED},
+)
+POPULAR_BOOKS = StaticCatalog("top_books.json", transform=extract_books_items)
 # Create your views here.
 
 
@@ -35,19 +45,15 @@ def summarize_book(request):
         except Exception as E:
             # print("ERROR CREATING EXTRACT: ", E)
             pass
-        update_subscription_usage(request.user, "summaries")
-        try:
-            # CHECK IF BOOK ALREADY SUMMARIZED
-            get_book = BookAnalysisResponse.objects.get(book_id=book_id)
-            serializer = BookAnalysisResponseSerializer(get_book)
+        # CHECK IF BOOK ALREADY SUMMARIZED
+        book_document = get_analysis_document(book_id)
+        if book_document is not None:
             return Response({
-                    "data": serializer.data,
+                    "data": book_document,
                     "errors": "",
                     "message": "has book",
                     "status": "error",
                 }, status=status.HTTP_200_OK)
-        except:
-            pass
         SCHEDULE_BOOK_SUMMARY(book_title, book_author, book_id)
         # gemini_response = generate_summary_keypoints(book_title, book_author)
         # parseResponse = json.loads(gemini_response)
@@ -75,10 +81,20 @@ def summarize_book(request):
 @permission_classes([IsAuthenticated])
 def get_summarized_book(request, id):
     try:
-        get_book = BookAnalysisResponse.objects.get(book_id=id)
-        serializer = BookAnalysisResponseSerializer(get_book)
+        book_document = get_analysis_document(id)
+        if book_document is None:
+            # Let clients know a generation is already running instead of a bare 404
+            generation = SummaryGeneration.objects.filter(book_id=id).first()
+            if generation and generation.is_in_flight():
+                return Response({
+                        "data": None,
+                        "errors": "",
+                        "message": "pending",
+                        "status": "pending",
+                    }, status=status.HTTP_202_ACCEPTED)
+            raise BookAnalysisResponse.DoesNotExist("BookAnalysisResponse matching query does not exist.")
         return Response({
-                "data": serializer.data,
+                "data": book_document,
                 "errors": "",
                 "message": "success",
                 "status": "error",
@@ -166,14 +182,7 @@ def get_book_by_id_api(request, id):
 @permission_classes([AllowAny])
 def load_book_categories(request):
     try:
-        category_path = os.path.join(BASE_DIR, 'static', "categories.json")
-        load_categories = open(category_path, 'r')
-        categories = json.load(load_categories)
-        return Response({   
-            "data": categories, 
-            "message":"success",
-            "status": status.HTTP_201_CREATED,
-            }, status=status.HTTP_200_OK)
+        return BOOK_CATEGORIES.response(request)
             
     except Exception as e:
         return Response(
@@ -192,16 +201,7 @@ def load_book_categories(request):
 @permission_classes([AllowAny])
 def load_popular_books(request):
     try:
-        top_books_path = os.path.join(BASE_DIR, 'static', "top_books.json")
-        load_books = open(top_books_path, 'r')
-        top_books = json.load(load_books)
-        extract_books = extract_books_items(top_books)
-        # print(extract_books)
-        return Response({   
-            "data": extract_books, 
-            "message":"success",
-            "status": status.HTTP_200_OK,
-            }, status=status.HTTP_200_OK)
+        return POPULAR_BOOKS.response(request)
             
     except Exception as e:
         return Response(
@@ -213,13 +213,13 @@ def load_popular_books(request):
         )
 
 
-from .get_top_50_books import get_top_50
+from .get_top_50_books import get_top_50_snapshot
 @ratelimit(key='ip', rate='30/1d')
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_50_books(request):
     try:
-        top_50_books = get_top_50()
+        top_50_books = get_top_50_snapshot()
         return Response({   
             "data": top_50_books, 
             "message":"success",
@@ -290,14 +290,17 @@ def remove_book_mark(request):
 @permission_classes([IsAuthenticated])
 def get_book_marks(request):
     try:
-        bookmark_books = BookmarkBook.objects.filter(user=request.user)
+        bookmark_books, next_cursor = paginate_by_created(BookmarkBook.objects.filter(user=request.user), request)
         serializer = BookmarkBookSerializer(bookmark_books, many=True)
         return Response({   
             "data": serializer.data, 
+            "next_cursor": next_cursor,
             "message":"success",
             "status": status.HTTP_200_OK,
             }, status=status.HTTP_200_OK)
             
+    except InvalidCursor as e:
+        return invalid_cursor_response(e)
     except Exception as e:
         return Response(
             {
@@ -314,14 +317,17 @@ def get_book_marks(request):
 @permission_classes([IsAuthenticated])
 def get_user_extracted_books(request):
     try:
-        fetch_books = UserExtractedBooks.objects.filter(user=request.user)
+        fetch_books, next_cursor = paginate_by_created(UserExtractedBooks.objects.filter(user=request.user), request)
         serializer = UserExtractedBooksSerializer(fetch_books, many=True)
         return Response({   
             "data": serializer.data, 
+            "next_cursor": next_cursor,
             "message":"success",
             "status": status.HTTP_201_CREATED,
             }, status=status.HTTP_200_OK)
             
+    except InvalidCursor as e:
+        return invalid_cursor_response(e)
     except Exception as e:
         return Response(
             {
@@ -361,7 +367,7 @@ def delete_user_extracted_books(request):
 @ratelimit(key='ip', rate='40/60m')
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-# @subscription_limit_required('note')
+@subscription_limit_required('notes')
 def save_note(request):
     try:
         data = request.data
@@ -371,7 +377,6 @@ def save_note(request):
             note_type = "note"
         bookmark_book, created = Notes.objects.get_or_create(content=data['content'], title=data['title'], book_id=data['book_id'], book_title=data['book_title'], book_author=data['book_author'], note_type=note_type, user=request.user)
         serializer = BookmarkBookSerializer(bookmark_book)
-        update_subscription_usage(request.user, "notes")
         return Response({   
             "data": serializer.data, 
             "message":"success",
@@ -395,14 +400,17 @@ def save_note(request):
 @permission_classes([IsAuthenticated])
 def get_notes(request):
     try:
-        user_notes = Notes.objects.filter(user=request.user).order_by('-created_at')
+        user_notes, next_cursor = paginate_by_created(Notes.objects.filter(user=request.user), request)
         serializer = NotesSerializer(user_notes, many=True)
         return Response({   
             "data": serializer.data, 
+            "next_cursor": next_cursor,
             "message":"success",
             "status": status.HTTP_200_OK,
             }, status=status.HTTP_200_OK)
             
+    except InvalidCursor as e:
+        return invalid_cursor_response(e)
     except Exception as e:
         return Response(
             {
@@ -450,7 +458,6 @@ def ai_search_book(request):
         except:
             author = None
         search_result = handle_search_book(data['title'], author)
-        update_subscription_usage(request.user, "smart_search")
         return Response({   
             "data": search_result['books'], 
             "message":"success",
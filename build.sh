@@ -9,5 +9,8 @@ pip install -r requirements.txt
 # Run migrations
 python manage.py migrate
 
+# Create the database cache table (no-op if it already exists)
+python manage.py createcachetable
+
 # Collect static files
 python manage.py collectstatic --no-input
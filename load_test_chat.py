@@ -0,0 +1,171 @@
+"""
+Load test for BookChatConsumer: N concurrent WebSocket chats against a local fake Gemini server.
+
+    GEMINI_BASE_URL is pointed at the fake server before Django starts, so the real
+    google-genai client and consumer code run unchanged. Runs against a throwaway test database.
+
+    python load_test_chat.py --sockets 200 --latency 1.0
+    python load_test_chat.py --sockets 200 --latency 1.0 --sync   # previous sync_to_async path
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+
+FAKE_RESPONSE = {
+    "text": "This book argues that small habits compound into remarkable results over time. " * 3,
+    "noteable": "Small habits compound.",
+}
+STREAM_CHUNK_SIZE = 24
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """Answers generateContent and streamGenerateContent (SSE) after a fixed latency"""
+    latency = 1.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        body = json.dumps(FAKE_RESPONSE)
+
+        if ":streamGenerateContent" in self.path:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i in range(0, len(body), STREAM_CHUNK_SIZE):
+                event = self.candidate(body[i:i + STREAM_CHUNK_SIZE])
+                self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+                self.wfile.flush()
+                time.sleep(0.01)
+            self.close_connection = True
+            return
+
+        payload = json.dumps(self.candidate(body)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    @staticmethod
+    def candidate(text):
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # listen backlog, the default of 5 resets bursts of connections
+
+
+def start_fake_server(latency):
+    FakeGeminiHandler.latency = latency
+    server = FakeGeminiServer(("127.0.0.1", 0), FakeGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_socket(application, token, message_type):
+    from channels.testing import WebsocketCommunicator
+
+    communicator = WebsocketCommunicator(application, f"/ws/chat/?token={token}")
+    connected, _ = await communicator.connect()
+    if not connected:
+        raise RuntimeError("WebSocket connection rejected")
+    await communicator.receive_json_from()  # connection_established
+
+    started = time.perf_counter()
+    first_frame = None
+    await communicator.send_json_to({
+        "type": message_type,
+        "book_id": "load_test_book",
+        "book_title": "Atomic Habits",
+        "book_author": "James Clear",
+        "summary": "A book about habits.",
+        "user_message": "What is the main idea?",
+    })
+    while True:
+        message = await communicator.receive_json_from(timeout=120)
+        if message["type"] in ("chat_delta", "chat_response") and first_frame is None:
+            first_frame = time.perf_counter() - started
+        if message["type"] in ("chat_response", "error"):
+            break
+    await communicator.disconnect()
+
+    if message["type"] == "error":
+        raise RuntimeError(message["message"])
+    return first_frame, time.perf_counter() - started
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def run_load(sockets, message_type):
+    from rest_framework_simplejwt.tokens import AccessToken
+    from channels.db import database_sync_to_async
+    from django.contrib.auth import get_user_model
+    from books.chat_ai.consumers import BookChatConsumer
+
+    user = await database_sync_to_async(get_user_model().objects.create_user)(
+        email="loadtest@bookflow.local", password="load-test"
+    )
+    token = str(AccessToken.for_user(user))
+    application = BookChatConsumer.as_asgi()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_socket(application, token, message_type) for _ in range(sockets)))
+    elapsed = time.perf_counter() - started
+
+    first_frames = [first for first, _ in results]
+    totals = [total for _, total in results]
+    print(f"{sockets} sockets ({message_type}) finished in {elapsed:.2f}s")
+    print(f"  first frame p50 {statistics.median(first_frames) * 1000:.0f} ms, p95 {percentile(first_frames, 95) * 1000:.0f} ms")
+    print(f"  full reply  p50 {statistics.median(totals) * 1000:.0f} ms, p95 {percentile(totals, 95) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sockets", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=1.0, help="fake LLM latency in seconds")
+    parser.add_argument("--stream", action="store_true", help="use chat_message_stream")
+    parser.add_argument("--sync", action="store_true", help="wrap the blocking client in sync_to_async like before")
+    args = parser.parse_args()
+
+    server = start_fake_server(args.latency)
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("GOOGLE_API_KEY", "load-test")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookflow_api.settings")
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    if args.sync:
+        from asgiref.sync import sync_to_async
+        from books.chat_ai import consumers
+        from books.chat_ai.main import generate_ai_chat
+        consumers.agenerate_ai_chat = sync_to_async(generate_ai_chat)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        asyncio.run(run_load(args.sockets, "chat_message_stream" if args.stream else "chat_message"))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Push dispatcher for NoteNotification reminders.
+
+dispatch_due_notifications() is run every minute by the scheduler. It claims reminders whose
+next_fire_at has passed with SELECT ... FOR UPDATE SKIP LOCKED, moves their next_fire_at on
+in one bulk UPDATE in the same transaction (so a concurrent or later run can't send them
+again), then sends them through Expo's push API in requests of up to EXPO_BATCH_SIZE messages.
+Tokens Expo reports as DeviceNotRegistered are cleared from their users.
+
+If a request to Expo fails, its reminders get their previous next_fire_at back (unless they
+were edited meanwhile) and the run stops, so the next run sends them again.
+"""
+import logging
+import requests
+from django.db import transaction
+from django.utils import timezone
+from account.models import User
+from .models import NoteNotification
+
+logger = logging.getLogger(__name__)
+
+EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+# Expo accepts at most 100 messages per request
+EXPO_BATCH_SIZE = 100
+CLAIM_SIZE = 1000
+
+
+class ExpoPushTransport:
+    def __init__(self, url=EXPO_PUSH_URL, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, messages):
+        """Send a batch of messages, return Expo's push tickets (one per message, in order)."""
+        response = self.session.post(self.url, json=messages, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json().get("data", [])
+
+
+class LocalPushTransport:
+    """Stand-in for Expo that records batches instead of sending them, for tests and local runs."""
+
+    def __init__(self):
+        self.batches = []
+
+    def send(self, messages):
+        self.batches.append(messages)
+        return [{"status": "ok", "id": f"local-{len(self.batches)}-{i}"} for i in range(len(messages))]
+
+
+def claim_due_notifications(now, limit=CLAIM_SIZE):
+    """Lock up to `limit` due reminders, advance their next_fire_at and return them."""
+    with transaction.atomic():
+        due = list(
+            NoteNotification.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(next_fire_at__lte=now)
+            .select_related("user")
+            .order_by("next_fire_at")[:limit]
+        )
+        for notification in due:
+            notification.claimed_fire_at = notification.next_fire_at
+            notification.claimed_last_fired_at = notification.last_fired_at
+            notification.next_fire_at = notification.following_fire_time(now)
+            notification.last_fired_at = now
+        NoteNotification.objects.bulk_update(due, ["next_fire_at", "last_fired_at"], batch_size=CLAIM_SIZE)
+    return due
+
+
+def restore_fire_times(notifications):
+    """Make reminders whose push failed due again, unless they were rescheduled since the claim."""
+    for notification in notifications:
+        NoteNotification.objects.filter(pk=notification.pk, next_fire_at=notification.next_fire_at).update(
+            next_fire_at=notification.claimed_fire_at, last_fired_at=notification.claimed_last_fired_at
+        )
+
+
+def build_message(notification):
+    return {
+        "to": notification.user.notification_token,
+        "title": notification.title or "",
+        "body": notification.content,
+        "data": {"noteId": notification.noteId},
+    }
+
+
+def send_push_batches(messages, transport):
+    """
+    Send messages EXPO_BATCH_SIZE at a time.
+    Returns (sent, tokens Expo no longer recognises, positions of messages whose request failed).
+    """
+    sent = 0
+    stale_tokens = set()
+    failed = []
+    for start in range(0, len(messages), EXPO_BATCH_SIZE):
+        batch = messages[start:start + EXPO_BATCH_SIZE]
+        try:
+            tickets = transport.send(batch)
+        except Exception as e:
+            logger.error(f"Push batch of {len(batch)} failed: {e}")
+            failed.extend(range(start, start + len(batch)))
+            continue
+        for message, ticket in zip(batch, tickets):
+            if ticket.get("status") == "ok":
+                sent += 1
+            elif ticket.get("details", {}).get("error") == "DeviceNotRegistered":
+                stale_tokens.add(message["to"])
+            else:
+                logger.warning(f"Push to {message['to']} rejected: {ticket.get('message')}")
+    return sent, stale_tokens, failed
+
+
+def dispatch_due_notifications(transport=None, now=None):
+    """Send every reminder that is due. Returns the number of pushes Expo accepted."""
+    transport = transport or ExpoPushTransport()
+    now = now or timezone.now()
+    sent = 0
+    while True:
+        due = claim_due_notifications(now)
+        if not due:
+            break
+        notifying = [notification for notification in due if notification.user.notification_token]
+        batch_sent, stale_tokens, failed = send_push_batches(
+            [build_message(notification) for notification in notifying], transport
+        )
+        sent += batch_sent
+        if stale_tokens:
+            User.objects.filter(notification_token__in=stale_tokens).update(notification_token=None)
+        if failed:
+            restore_fire_times([notifying[position] for position in failed])
+            # Expo is failing: leave the rest to the next run rather than reclaiming these now
+            break
+        if len(due) < CLAIM_SIZE:
+            break
+    if sent:
+        logger.info(f"Sent {sent} reminder notifications")
+    return sent
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:45
+
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Frozen copies of notifications.reminders.parse_reminder_time / next_fire_time as of this migration
+REMINDER_TIME_PATTERN = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*$", re.IGNORECASE)
+
+
+def parse_reminder_time(reminder_time):
+    match = REMINDER_TIME_PATTERN.match(reminder_time or "")
+    if match is None:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def next_fire_time(reminder_time, frequency, utc_offset_hours, after):
+    parsed = parse_reminder_time(reminder_time)
+    if parsed is None:
+        return None
+    offset = timedelta(hours=utc_offset_hours or 0)
+    local_after = after.astimezone(dt_timezone.utc).replace(tzinfo=None) + offset
+    local_fire = datetime.combine(local_after.date(), time(*parsed))
+    if local_fire <= local_after:
+        local_fire += timedelta(days=1)
+    return (local_fire - offset).replace(tzinfo=dt_timezone.utc)
+
+
+def schedule_existing_reminders(apps, schema_editor):
+    NoteNotification = apps.get_model('notifications', 'NoteNotification')
+    now = timezone.now()
+    reminders = list(NoteNotification.objects.select_related('user'))
+    for reminder in reminders:
+        reminder.next_fire_at = next_fire_time(reminder.reminder_time, reminder.frequency, reminder.user.timezone, now)
+    NoteNotification.objects.bulk_update(reminders, ['next_fire_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_alter_notenotification_reminder_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notenotification',
+            name='last_fired_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notenotification',
+            name='next_fire_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(schedule_existing_reminders, migrations.RunPython.noop),
+    ]
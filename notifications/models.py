@@ -1,6 +1,8 @@
 from django.db import models
+from django.utils import timezone
 from account.utils import generate_id
 from account.models import User
+from .reminders import following_fire_time, monthly_anchor_day, next_fire_time, shift_to_new_offset
 
 # Create your models here.
 
@@ -27,6 +29,43 @@ class NoteNotification(models.Model):
     title =  models.CharField(max_length=1000, blank=True, null=True)
     content = models.TextField()
     noteId = models.CharField(max_length=300, blank=True, null=True)
+    # Next time this reminder is due, in UTC; None when reminder_time can't be parsed
+    next_fire_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    last_fired_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    def schedule(self, after=None):
+        self.next_fire_at = next_fire_time(
+            self.reminder_time, self.frequency, self.user.timezone, after or timezone.now()
+        )
+
+    def following_fire_time(self, now):
+        """next_fire_at after the reminder fires at its current next_fire_at."""
+        anchor_day = None
+        if self.frequency == "monthly":
+            anchor_day = monthly_anchor_day(self.reminder_time, self.user.timezone, self.created_at or now)
+        return following_fire_time(self.next_fire_at, self.frequency, now, self.user.timezone, anchor_day)
+
+    def save(self, *args, **kwargs):
+        if self.next_fire_at is None:
+            self.schedule()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def reschedule_for_offset_change(cls, user, old_offset_hours):
+        """
+        Keep a user's reminders at the same local time after their UTC offset changed
+        (signals.py calls this when User.timezone is saved with a new value).
+        """
+        now = timezone.now()
+        reminders = list(cls.objects.filter(user=user, next_fire_at__isnull=False))
+        for reminder in reminders:
+            reminder.user = user
+            reminder.next_fire_at = shift_to_new_offset(reminder.next_fire_at, old_offset_hours, user.timezone)
+            if reminder.next_fire_at <= now:
+                reminder.next_fire_at = reminder.following_fire_time(now)
+        cls.objects.bulk_update(reminders, ["next_fire_at"], batch_size=500)
+        return len(reminders)
+
     def __str__(self):
         return f"{self.user.email}"
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+When a NoteNotification reminder fires.
+
+reminder_time is the free text the app sends ("6am", "12pm", "6:30pm" or "18:30"), in the
+user's local time; User.timezone is their offset from UTC in hours. next_fire_time turns that
+and the frequency into the next UTC instant, which is stored on the reminder as next_fire_at.
+"""
+import calendar
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+REMINDER_TIME_PATTERN = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*$", re.IGNORECASE)
+
+FREQUENCY_DAYS = {
+    "daily": 1,
+    "every-other-day": 2,
+    "weekly": 7,
+}
+
+
+def parse_reminder_time(reminder_time):
+    """(hour, minute) of a reminder_time string, or None if it can't be read."""
+    match = REMINDER_TIME_PATTERN.match(reminder_time or "")
+    if match is None:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def to_local(value, utc_offset_hours):
+    """Naive local wall time of an aware datetime for a UTC offset in hours."""
+    return value.astimezone(dt_timezone.utc).replace(tzinfo=None) + timedelta(hours=utc_offset_hours or 0)
+
+
+def from_local(value, utc_offset_hours):
+    return (value - timedelta(hours=utc_offset_hours or 0)).replace(tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months=1, anchor_day=None):
+    """Same time `months` later on anchor_day (default value's day), clamped to the month's last day."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    day = min(anchor_day or value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def advance(value, frequency, anchor_day=None):
+    if frequency == "monthly":
+        return add_months(value, anchor_day=anchor_day)
+    return value + timedelta(days=FREQUENCY_DAYS.get(frequency, 1))
+
+
+def next_fire_time(reminder_time, frequency, utc_offset_hours, after):
+    """
+    First UTC datetime strictly after `after` on the reminder's schedule, or None if
+    reminder_time can't be parsed.
+    """
+    parsed = parse_reminder_time(reminder_time)
+    if parsed is None:
+        return None
+    local_after = to_local(after, utc_offset_hours)
+    local_fire = datetime.combine(local_after.date(), time(*parsed))
+    if local_fire <= local_after:
+        local_fire += timedelta(days=1)
+    return from_local(local_fire, utc_offset_hours)
+
+
+def monthly_anchor_day(reminder_time, utc_offset_hours, created_at):
+    """Local day of the month a monthly reminder fires on: the day of its first fire after creation."""
+    first_fire = next_fire_time(reminder_time, "monthly", utc_offset_hours, created_at)
+    return None if first_fire is None else to_local(first_fire, utc_offset_hours).day
+
+
+def following_fire_time(fired_at, frequency, now, utc_offset_hours=0, anchor_day=None):
+    """
+    Next fire after a reminder fired at fired_at, skipping any occurrences missed before now.
+    Steps are taken in the user's local time, and monthly steps land on anchor_day, so a
+    reminder on the 31st returns to the 31st after a short month instead of drifting.
+    """
+    local_now = to_local(now, utc_offset_hours)
+    next_fire = advance(to_local(fired_at, utc_offset_hours), frequency, anchor_day)
+    while next_fire <= local_now:
+        next_fire = advance(next_fire, frequency, anchor_day)
+    return from_local(next_fire, utc_offset_hours)
+
+
+def shift_to_new_offset(fire_at, old_offset_hours, new_offset_hours):
+    """The UTC instant with the same local wall time as fire_at under the new UTC offset."""
+    return fire_at + timedelta(hours=(old_offset_hours or 0) - (new_offset_hours or 0))
@@ -0,0 +1,21 @@
+"""Reschedule a user's reminders when their UTC offset (User.timezone) changes."""
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from account.models import User
+from .models import NoteNotification
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_offset(sender, instance, update_fields=None, **kwargs):
+    instance._previous_timezone = None
+    if instance._state.adding or (update_fields is not None and "timezone" not in update_fields):
+        return
+    instance._previous_timezone = User.objects.filter(pk=instance.pk).values_list("timezone", flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def reschedule_on_offset_change(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_timezone", None)
+    if created or previous is None or previous == instance.timezone:
+        return
+    NoteNotification.reschedule_for_offset_change(instance, previous)
@@ -1,3 +1,110 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 from django.test import TestCase
 
-# Create your tests here.
+from account.models import User
+from .dispatch import EXPO_BATCH_SIZE, LocalPushTransport, dispatch_due_notifications
+from .models import NoteNotification
+from .reminders import following_fire_time, next_fire_time, parse_reminder_time
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class ReminderScheduleTests(TestCase):
+    def test_parses_app_reminder_times(self):
+        self.assertEqual(parse_reminder_time("6am"), (6, 0))
+        self.assertEqual(parse_reminder_time("12pm"), (12, 0))
+        self.assertEqual(parse_reminder_time("6:30pm"), (18, 30))
+        self.assertEqual(parse_reminder_time("18:30"), (18, 30))
+        self.assertIsNone(parse_reminder_time("soon"))
+
+    def test_next_fire_uses_the_users_offset(self):
+        # 8am at UTC+1 is 07:00 UTC; at 06:00 UTC it is still ahead today
+        self.assertEqual(next_fire_time("8am", "daily", 1, utc(2026, 3, 10, 6, 0)), utc(2026, 3, 10, 7, 0))
+        # Already passed today, so tomorrow
+        self.assertEqual(next_fire_time("8am", "daily", 1, utc(2026, 3, 10, 7, 0)), utc(2026, 3, 11, 7, 0))
+
+    def test_monthly_reminders_return_to_their_anchor_day(self):
+        fire = utc(2026, 1, 31, 7, 0)
+        fires = []
+        for _ in range(3):
+            fire = following_fire_time(fire, "monthly", fire, utc_offset_hours=1, anchor_day=31)
+            fires.append(fire)
+        self.assertEqual(fires, [utc(2026, 2, 28, 7, 0), utc(2026, 3, 31, 7, 0), utc(2026, 4, 30, 7, 0)])
+
+    def test_monthly_steps_use_the_local_calendar(self):
+        # 8am on the 1st at UTC+10 is 22:00 UTC on the last day of the previous month
+        fire = following_fire_time(utc(2026, 2, 28, 22, 0), "monthly", utc(2026, 3, 1, 0, 0), utc_offset_hours=10, anchor_day=1)
+        self.assertEqual(fire, utc(2026, 3, 31, 22, 0))
+
+
+class OffsetChangeTests(TestCase):
+    def test_changing_the_users_offset_keeps_the_local_time(self):
+        user = User.objects.create(id="traveller", username="traveller", email="traveller@bookflow.test", timezone=1)
+        reminder = NoteNotification.objects.create(id="reminder", user=user, reminder_time="8am", frequency="weekly", content="Read")
+        before = reminder.next_fire_at
+
+        user.timezone = 3
+        user.save()
+
+        reminder.refresh_from_db()
+        # Same 8am local, two hours earlier in UTC (or a week on if that is already past)
+        shifted = before - timedelta(hours=2)
+        self.assertIn(reminder.next_fire_at, [shifted, shifted + timedelta(days=7)])
+        self.assertEqual(reminder.next_fire_at.hour, 5)
+
+
+class FailingFirstBatchTransport(LocalPushTransport):
+    def send(self, messages):
+        if not self.batches:
+            self.batches.append(None)
+            raise ConnectionError("Expo unavailable")
+        return super().send(messages)
+
+
+class DispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = utc(2026, 3, 10, 12, 0)
+        cls.user = User.objects.create(id="reader", username="reader", email="reader@bookflow.test", notification_token="ExponentPushToken[reader]")
+        NoteNotification.objects.bulk_create([
+            NoteNotification(
+                id=f"reminder-{i}", user=cls.user, reminder_time="8am", frequency="daily",
+                title="Note", content="Remember", next_fire_at=cls.now - timedelta(minutes=1),
+            )
+            for i in range(EXPO_BATCH_SIZE + 50)
+        ])
+        NoteNotification.objects.create(
+            id="later", user=cls.user, reminder_time="8am", frequency="weekly",
+            content="Later", next_fire_at=cls.now + timedelta(hours=1),
+        )
+
+    def test_due_reminders_are_sent_in_expo_batches(self):
+        transport = LocalPushTransport()
+
+        sent = dispatch_due_notifications(transport=transport, now=self.now)
+
+        self.assertEqual(sent, EXPO_BATCH_SIZE + 50)
+        self.assertEqual([len(batch) for batch in transport.batches], [EXPO_BATCH_SIZE, 50])
+
+    def test_sent_reminders_are_advanced_and_not_sent_twice(self):
+        dispatch_due_notifications(transport=LocalPushTransport(), now=self.now)
+
+        reminder = NoteNotification.objects.get(id="reminder-0")
+        self.assertEqual(reminder.next_fire_at, self.now - timedelta(minutes=1) + timedelta(days=1))
+        self.assertEqual(NoteNotification.objects.get(id="later").next_fire_at, self.now + timedelta(hours=1))
+
+        transport = LocalPushTransport()
+        self.assertEqual(dispatch_due_notifications(transport=transport, now=self.now), 0)
+        self.assertEqual(transport.batches, [])
+
+    def test_reminders_of_a_failed_batch_are_due_again(self):
+        due_at = self.now - timedelta(minutes=1)
+
+        self.assertEqual(dispatch_due_notifications(transport=FailingFirstBatchTransport(), now=self.now), 50)
+
+        self.assertEqual(NoteNotification.objects.filter(next_fire_at=due_at).count(), EXPO_BATCH_SIZE)
+        self.assertEqual(NoteNotification.objects.filter(next_fire_at=due_at + timedelta(days=1)).count(), 50)
+        self.assertEqual(dispatch_due_notifications(transport=LocalPushTransport(), now=self.now), EXPO_BATCH_SIZE)
@@ -8,11 +8,13 @@ from .models import NoteNotification
 from account.models import User
 from books.models import Notes
 from .serializers import NoteNotificationSerializer
-from account.subscription_utils import update_subscription_usage, subscription_limit_required
+from account.subscription_utils import subscription_limit_required
+from books.static_catalogs import StaticCatalog
 import json
 import os 
 from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
+NOTIFICATION_TIMES = StaticCatalog("notification_times.json")
 # Create your views here.
 
 
@@ -41,7 +43,6 @@ def save_note_notification(request):
             
         except Exception as e:
             pass        
-        update_subscription_usage(request.user, "reminders")
         return Response({   
             "data": serializer.data, 
             "message":"success",
@@ -110,16 +111,7 @@ def get_note_notification(request, noteId):
 @api_view(["GET"])
 def load_notification_schedule_times(request):
     try:
-        notification_times = os.path.join(BASE_DIR, 'static', "notification_times.json")
-        load_times = open(notification_times, 'r')
-        times = json.load(load_times)
-        
-        # print(extract_books)
-        return Response({   
-            "data": times, 
-            "message":"success",
-            "status": status.HTTP_200_OK,
-            }, status=status.HTTP_200_OK)
+        return NOTIFICATION_TIMES.response(request)
             
     except Exception as e:
         return Response(